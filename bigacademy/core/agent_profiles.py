@@ -4,13 +4,71 @@ BigAcademy Agent Profiles and Role Definitions
 Generic, config-based agent profile system
 """
 
-from dataclasses import dataclass, field
-from typing import List, Dict, Optional, Any
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, fields, is_dataclass, MISSING
+from functools import cached_property
+from typing import List, Dict, Optional, Any, Tuple, get_origin, get_args
 from pathlib import Path
+import os
+import re
 import yaml
 import json
 
-@dataclass
+try:
+    from yaml import CSafeLoader as _Loader, CSafeDumper as _Dumper
+except ImportError:  # libyaml not available
+    from yaml import SafeLoader as _Loader, SafeDumper as _Dumper
+
+def _to_dict_expr(name: str, field_type: Any) -> str:
+    """Source expression copying one field the way asdict() would"""
+    origin = get_origin(field_type)
+    if origin is list:
+        return f"list(self.{name})"
+    if origin is dict:
+        if get_origin(get_args(field_type)[1]) is list:
+            return f"{{k: list(v) for k, v in self.{name}.items()}}"
+        return f"dict(self.{name})"
+    if is_dataclass(field_type):
+        return f"self.{name}.to_dict()"
+    return f"self.{name}"
+
+def _with_dict_methods(cls):
+    """Attach straight-line from_dict/_as_dict generated from the dataclass fields"""
+    namespace = {}
+    arguments = []
+    items = []
+    
+    for f in fields(cls):
+        if is_dataclass(f.type):
+            namespace[f"_{f.name}_type"] = f.type
+            value = f"_{f.name}_type.from_dict(data[{f.name!r}])"
+        elif f.default_factory is not MISSING:
+            namespace[f"_{f.name}_default"] = f.default_factory
+            value = f"data[{f.name!r}] if {f.name!r} in data else _{f.name}_default()"
+        elif f.default is not MISSING:
+            namespace[f"_{f.name}_default"] = f.default
+            value = f"data.get({f.name!r}, _{f.name}_default)"
+        else:
+            value = f"data[{f.name!r}]"
+        arguments.append(f"        {f.name}=({value}),")
+        items.append(f"        {f.name!r}: {_to_dict_expr(f.name, f.type)},")
+    
+    source = "\n".join([
+        "def from_dict(cls, data):",
+        f'    """Create {cls.__name__} from dictionary"""',
+        "    return cls(", *arguments, "    )",
+        "",
+        "def _as_dict(self):",
+        "    return {", *items, "    }",
+    ])
+    exec(source, namespace)
+    
+    cls.from_dict = classmethod(namespace['from_dict'])
+    cls._as_dict = namespace['_as_dict']
+    return cls
+
+@_with_dict_methods
+@dataclass(frozen=True)
 class RoleDefinition:
     """Generic role definition loaded from config"""
     title: str
@@ -21,22 +79,10 @@ class RoleDefinition:
     decision_authority: List[str]
     domain_expertise: List[str]
     
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'RoleDefinition':
-        """Create role from dictionary"""
-        return cls(**data)
-    
     def to_dict(self) -> Dict[str, Any]:
         """Convert role to dictionary"""
-        return {
-            'title': self.title,
-            'description': self.description,
-            'responsibilities': self.responsibilities,
-            'identity_prompt': self.identity_prompt,
-            'communication_style': self.communication_style,
-            'decision_authority': self.decision_authority,
-            'domain_expertise': self.domain_expertise
-        }
+        # Generated straight-line copy: callers get fresh lists and dicts
+        return self._as_dict()
     
     def get_identity_context(self) -> str:
         """Get role identity for dataset generation"""
@@ -46,7 +92,8 @@ Identity: {self.identity_prompt}
 Communication Style: {self.communication_style}
 Expertise: {', '.join(self.domain_expertise)}"""
 
-@dataclass 
+@_with_dict_methods
+@dataclass(frozen=True)
 class AgentProfile:
     """Generic agent profile loaded from config"""
     name: str
@@ -58,42 +105,33 @@ class AgentProfile:
     exclude_patterns: List[str] = field(default_factory=list)
     knowledge_filters: Dict[str, List[str]] = field(default_factory=dict)
     
-    @classmethod
-    def from_dict(cls, data: Dict[str, Any]) -> 'AgentProfile':
-        """Create profile from dictionary"""
-        role = RoleDefinition.from_dict(data['role'])
-        return cls(
-            name=data['name'],
-            role=role,
-            technologies=data['technologies'],
-            knowledge_sources=data['knowledge_sources'],
-            focus_areas=data['focus_areas'],
-            file_patterns=data.get('file_patterns', []),
-            exclude_patterns=data.get('exclude_patterns', []),
-            knowledge_filters=data.get('knowledge_filters', {})
-        )
-    
     def to_dict(self) -> Dict[str, Any]:
         """Convert profile to dictionary"""
-        return {
-            'name': self.name,
-            'role': self.role.to_dict(),
-            'technologies': self.technologies,
-            'knowledge_sources': self.knowledge_sources,
-            'focus_areas': self.focus_areas,
-            'file_patterns': self.file_patterns,
-            'exclude_patterns': self.exclude_patterns,
-            'knowledge_filters': self.knowledge_filters
-        }
+        # Generated straight-line copy: callers get fresh lists and dicts
+        return self._as_dict()
+    
+    @cached_property
+    def _tech_lower(self) -> Tuple[str, ...]:
+        """Lowercased technologies, computed once"""
+        return tuple(tech.lower() for tech in self.technologies)
+    
+    @cached_property
+    def _focus_re(self) -> Optional[re.Pattern]:
+        """Single regex matching any (lowercased) focus area"""
+        if not self.focus_areas:
+            return None
+        return re.compile('|'.join(re.escape(area.lower()) for area in self.focus_areas))
     
     def matches_technology(self, tech_name: str) -> bool:
         """Check if technology is relevant to this agent"""
-        return any(tech.lower() in tech_name.lower() for tech in self.technologies)
+        tech_name_lower = tech_name.lower()
+        return any(tech in tech_name_lower for tech in self._tech_lower)
     
     def matches_focus_area(self, content: str) -> bool:
         """Check if content matches agent's focus areas"""
-        content_lower = content.lower()
-        return any(area.lower() in content_lower for area in self.focus_areas)
+        if self._focus_re is None:
+            return False
+        return self._focus_re.search(content.lower()) is not None
     
     def get_knowledge_context(self) -> str:
         """Get knowledge context for this agent"""
@@ -108,6 +146,7 @@ class AgentProfileManager:
     def __init__(self, profiles_dir: Optional[Path] = None):
         self.profiles_dir = profiles_dir or Path("configs/agents")
         self.profiles: Dict[str, AgentProfile] = {}
+        self._stat_cache: Dict[str, Tuple[int, int]] = {}  # profile -> (mtime_ns, size)
         self._ensure_profiles_dir()
     
     def _ensure_profiles_dir(self):
@@ -118,9 +157,16 @@ class AgentProfileManager:
         """Load all agent profiles from config directory"""
         self.profiles.clear()
         
-        for profile_file in self.profiles_dir.glob("*.yaml"):
-            profile_name = profile_file.stem
-            profile = self.load_profile(profile_name)
+        profile_names = [f.stem for f in self.profiles_dir.glob("*.yaml")]
+        
+        # Profiles are independent files - read and parse them concurrently
+        if len(profile_names) < 4:
+            profiles = [self.load_profile(name) for name in profile_names]
+        else:
+            with ThreadPoolExecutor(max_workers=min(32, len(profile_names))) as executor:
+                profiles = list(executor.map(self.load_profile, profile_names))
+        
+        for profile_name, profile in zip(profile_names, profiles):
             if profile:
                 self.profiles[profile_name] = profile
         
@@ -128,13 +174,14 @@ class AgentProfileManager:
     
     def get_profile(self, name: str) -> Optional[AgentProfile]:
         """Get agent profile by name"""
+        # Cached profiles are served as-is; load_profile() re-checks the file
         if name not in self.profiles:
             self.load_profile(name)
         return self.profiles.get(name)
     
     def list_profiles(self) -> List[str]:
         """List available agent profiles"""
-        # Check for new profiles in directory
+        # Every *.yaml file is a profile, keyed by its stem - no parsing needed
         available_profiles = [f.stem for f in self.profiles_dir.glob("*.yaml")]
         return sorted(set(list(self.profiles.keys()) + available_profiles))
     
@@ -152,7 +199,9 @@ class AgentProfileManager:
             profile_data = profile.to_dict()
             
             with open(profile_file, 'w') as f:
-                yaml.dump(profile_data, f, default_flow_style=False, allow_unicode=True)
+                yaml.dump(profile_data, f, Dumper=_Dumper, default_flow_style=False, allow_unicode=True)
+            
+            self._stat_cache.pop(profile.name, None)
             
             print(f"✅ Saved profile: {profile.name}")
             return True
@@ -162,19 +211,27 @@ class AgentProfileManager:
             return False
     
     def load_profile(self, profile_name: str) -> Optional[AgentProfile]:
-        """Load agent profile from YAML file"""
+        """Load agent profile from YAML file, re-parsing only if it changed since the last load"""
         try:
             profile_file = self.profiles_dir / f"{profile_name}.yaml"
             
-            if not profile_file.exists():
+            try:
+                stat = os.stat(profile_file)
+            except FileNotFoundError:
                 print(f"⚠️  Profile not found: {profile_name}")
                 return None
             
+            # Return cached profile if the file is unchanged since last load
+            stat_key = (stat.st_mtime_ns, stat.st_size)
+            if self._stat_cache.get(profile_name) == stat_key and profile_name in self.profiles:
+                return self.profiles[profile_name]
+            
             with open(profile_file, 'r') as f:
-                data = yaml.safe_load(f)
+                data = yaml.load(f, Loader=_Loader)
             
             profile = AgentProfile.from_dict(data)
             self.profiles[profile_name] = profile
+            self._stat_cache[profile_name] = stat_key
             
             print(f"✅ Loaded profile: {profile_name}")
             return profile
@@ -193,6 +250,7 @@ class AgentProfileManager:
             
             if profile_name in self.profiles:
                 del self.profiles[profile_name]
+            self._stat_cache.pop(profile_name, None)
             
             print(f"✅ Deleted profile: {profile_name}")
             return True
@@ -6,15 +6,30 @@ SQLite-based graph storage with NetworkX for analysis
 
 import sqlite3
 import json
+import hashlib
 import uuid
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
-from typing import List, Dict, Any, Optional, Tuple, Set
+from itertools import islice
+from typing import List, Dict, Any, Iterable, Optional, Tuple, Set
 from dataclasses import dataclass, asdict
 import networkx as nx
 
+try:
+    import orjson
+    
+    def _jdumps(obj: Any) -> str:
+        # Keep TEXT storage so json_extract()/name_key keep working
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode()
+    
+    _jloads = orjson.loads
+except ImportError:  # fall back to the stdlib codec
+    _jdumps = json.dumps
+    _jloads = json.loads
+
 from .agent_profiles import AgentProfile
-from ..extractors.base_extractor import KnowledgeChunk, ExtractionResult
+from ..extractors.base_extractor import KnowledgeChunk, ExtractionResult, KeywordMatcher
 
 @dataclass
 class GraphNode:
@@ -36,20 +51,109 @@ class GraphEdge:
     weight: float
     created_at: str
 
+# KnowledgeChunk fields live in knowledge_chunks columns and chunk text once
+# in chunk_blobs (keyed by sha1); node reads join them back into properties
+_CHUNK_COLUMNS = """
+    kc.node_id AS chunk_node_id, kc.source_path, kc.file_type, kc.language,
+    kc.size_tokens, kc.relevance_milli, b.content AS blob_content
+"""
+_CHUNK_JOINS = """
+    LEFT JOIN knowledge_chunks kc ON kc.node_id = n.id
+    LEFT JOIN chunk_blobs b ON b.id = json_extract(n.properties, '$.content_sha1')
+"""
+_NODE_SELECT = f"SELECT n.*, {_CHUNK_COLUMNS} FROM nodes n {_CHUNK_JOINS}"
+# Same value _node_properties() restores as properties['relevance_score']
+_RELEVANCE_EXPR = """
+    CASE WHEN kc.node_id IS NOT NULL THEN kc.relevance_milli / 1000.0
+         ELSE COALESCE(json_extract(n.properties, '$.relevance_score'), 0) END
+"""
+_CHUNK_TEXT_FIELDS = ("source_path", "file_type", "language")
+_SQL_BATCH_SIZE = 500  # IDs per IN (...) query, well under SQLite's variable limit
+# Read caches kept per GraphDB (entries, oldest evicted first)
+_GRAPH_CACHE_SIZE = 8  # agent knowledge graphs
+_NODE_CACHE_SIZE = 4096  # get_node results
+_FIND_CACHE_SIZE = 64  # find_nodes results
+
+def _node_properties(row: sqlite3.Row) -> Dict[str, Any]:
+    """Decode a node's JSON properties and restore its chunk columns/content"""
+    properties = _jloads(row['properties'])
+    if row['chunk_node_id'] is not None:
+        properties.update(
+            source_path=row['source_path'],
+            file_type=row['file_type'],
+            language=row['language'],
+            size_tokens=row['size_tokens'],
+            relevance_score=row['relevance_milli'] / 1000
+        )
+    if row['blob_content'] is not None:
+        properties['content'] = row['blob_content']
+    return properties
+
+def _cache_put(cache: Dict, key: Any, value: Any, max_size: int):
+    """Store a cache entry, evicting the oldest one when the cache is full"""
+    if len(cache) >= max_size:
+        cache.pop(next(iter(cache)))
+    cache[key] = value
+
+# get_relationships picks one of these fixed statements, keyed on
+# (direction, filter by relationship type), so sqlite's statement cache hits
+_EDGE_QUERIES = {
+    ("outgoing", False): "SELECT * FROM edges WHERE source_id = ?",
+    ("outgoing", True): "SELECT * FROM edges WHERE source_id = ? AND relationship_type = ?",
+    ("incoming", False): "SELECT * FROM edges WHERE target_id = ?",
+    ("incoming", True): "SELECT * FROM edges WHERE target_id = ? AND relationship_type = ?",
+    ("both", False): "SELECT * FROM edges WHERE (source_id = ? OR target_id = ?)",
+    ("both", True): "SELECT * FROM edges WHERE (source_id = ? OR target_id = ?) AND relationship_type = ?",
+    (None, False): "SELECT * FROM edges",
+    (None, True): "SELECT * FROM edges WHERE relationship_type = ?",
+}
+
 class GraphDB:
     """Knowledge graph database with SQLite backend and NetworkX analysis"""
     
-    def __init__(self, db_path: Optional[Path] = None):
+    def __init__(self, db_path: Optional[Path] = None, read_only: bool = False,
+                 test_mode: bool = False):
         self.db_path = db_path or Path("data/knowledge_base.db")
-        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        self.read_only = read_only
+        # Scratch databases skip fsync entirely (an OS crash may lose recent commits)
+        self.test_mode = test_mode
+        if not read_only:
+            self.db_path.parent.mkdir(parents=True, exist_ok=True)
         self.conn = None
+        self._txn_depth = 0
+        # Read caches, valid while _data_version() is unchanged. Node and find
+        # caches hold raw rows (every hit builds a fresh node) and are only
+        # used inside cached_reads()
+        self._graph_cache: Dict[str, nx.Graph] = {}
+        self._node_cache: Dict[str, Optional[sqlite3.Row]] = {}
+        self._find_cache: Dict[Tuple, List[sqlite3.Row]] = {}
+        self._cache_version: Optional[Tuple[int, int]] = None
+        self._cached_reads_depth = 0
         self._initialize_database()
     
     def _initialize_database(self):
         """Initialize SQLite database with graph schema"""
+        if self.read_only:
+            # Existing database opened for queries only - schema is left as-is
+            if not self.db_path.is_file():
+                raise FileNotFoundError(
+                    f"Graph database not found: {self.db_path} "
+                    f"(read_only=True never creates one; open it writable first)"
+                )
+            self.conn = sqlite3.connect(f"{self.db_path.resolve().as_uri()}?mode=ro",
+                                        uri=True, check_same_thread=False)
+            self.conn.row_factory = sqlite3.Row
+            self._configure_pragmas()
+            self._shadow_legacy_schema()
+            print(f"✅ Graph database opened read-only: {self.db_path}")
+            return
+        
         self.conn = sqlite3.connect(str(self.db_path), check_same_thread=False)
         self.conn.row_factory = sqlite3.Row  # Enable column access by name
         
+        # Tune SQLite for bulk writes and concurrent reads
+        self._configure_pragmas()
+        
         # Create tables
         self._create_tables()
         
@@ -58,6 +162,53 @@ class GraphDB:
         
         print(f"✅ Graph database initialized: {self.db_path}")
     
+    def _configure_pragmas(self):
+        """Enable WAL journaling, memory-mapped I/O and a larger page cache"""
+        if self.read_only:
+            # Journal settings persist in the file; only tune the read side
+            self.conn.executescript('''
+                PRAGMA temp_store=MEMORY;
+                PRAGMA mmap_size=268435456;
+                PRAGMA cache_size=-65536;
+            ''')
+            return
+        
+        self.conn.executescript(f'''
+            PRAGMA page_size=8192;
+            PRAGMA journal_mode=WAL;
+            PRAGMA synchronous={"OFF" if self.test_mode else "NORMAL"};
+            PRAGMA temp_store=MEMORY;
+            PRAGMA mmap_size=268435456;
+            PRAGMA cache_size=-65536;
+        ''')
+    
+    def _shadow_legacy_schema(self):
+        """Stand in for schema a read-only open cannot migrate, using TEMP objects"""
+        tables = {row[0] for row in self.conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+        node_columns = {row['name'] for row in self.conn.execute('PRAGMA table_xinfo(nodes)')}
+        
+        # Empty chunk tables: the LEFT JOINs then fall back to the JSON properties
+        if 'knowledge_chunks' not in tables:
+            self.conn.execute('''
+                CREATE TEMP TABLE knowledge_chunks (
+                    node_id TEXT PRIMARY KEY,
+                    source_path TEXT,
+                    file_type TEXT,
+                    language TEXT,
+                    size_tokens INTEGER,
+                    relevance_milli INTEGER
+                )
+            ''')
+        if 'chunk_blobs' not in tables:
+            self.conn.execute("CREATE TEMP TABLE chunk_blobs (id TEXT PRIMARY KEY, content TEXT)")
+        
+        # TEMP objects shadow main ones, so queries on nodes see a computed name_key
+        if 'nodes' in tables and 'name_key' not in node_columns:
+            self.conn.execute(
+                "CREATE TEMP VIEW nodes AS "
+                "SELECT *, json_extract(properties, '$.name') AS name_key FROM main.nodes"
+            )
+    
     def _create_tables(self):
         """Create database tables for graph storage"""
         
@@ -68,10 +219,19 @@ class GraphDB:
                 node_type TEXT NOT NULL,
                 properties TEXT NOT NULL,  -- JSON
                 created_at TEXT NOT NULL,
-                updated_at TEXT NOT NULL
+                updated_at TEXT NOT NULL,
+                name_key TEXT AS (json_extract(properties, '$.name')) VIRTUAL
             )
         ''')
         
+        # Databases created before name_key existed get the column added
+        node_columns = {row['name'] for row in self.conn.execute('PRAGMA table_xinfo(nodes)')}
+        if 'name_key' not in node_columns:
+            self.conn.execute(
+                "ALTER TABLE nodes ADD COLUMN name_key TEXT "
+                "AS (json_extract(properties, '$.name')) VIRTUAL"
+            )
+        
         # Edges table - stores all relationships
         self.conn.execute('''
             CREATE TABLE IF NOT EXISTS edges (
@@ -87,6 +247,27 @@ class GraphDB:
             )
         ''')
         
+        # Chunk blobs - deduplicated chunk content, referenced by content_sha1
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS chunk_blobs (
+                id TEXT PRIMARY KEY,  -- sha1 hex digest of content
+                content TEXT NOT NULL
+            )
+        ''')
+        
+        # Knowledge chunks - typed columns for KnowledgeChunk nodes
+        self.conn.execute('''
+            CREATE TABLE IF NOT EXISTS knowledge_chunks (
+                node_id TEXT PRIMARY KEY,
+                source_path TEXT,
+                file_type TEXT,
+                language TEXT,
+                size_tokens INTEGER,
+                relevance_milli INTEGER,  -- round(relevance_score * 1000)
+                FOREIGN KEY (node_id) REFERENCES nodes (id)
+            )
+        ''')
+        
         # Agent sessions - track extraction sessions
         self.conn.execute('''
             CREATE TABLE IF NOT EXISTS agent_sessions (
@@ -107,9 +288,11 @@ class GraphDB:
         """Create database indexes for performance"""
         indexes = [
             "CREATE INDEX IF NOT EXISTS idx_nodes_type ON nodes(node_type)",
+            "CREATE INDEX IF NOT EXISTS idx_nodes_name ON nodes(node_type, name_key)",
             "CREATE INDEX IF NOT EXISTS idx_edges_source ON edges(source_id)",
             "CREATE INDEX IF NOT EXISTS idx_edges_target ON edges(target_id)",
             "CREATE INDEX IF NOT EXISTS idx_edges_type ON edges(relationship_type)",
+            "CREATE INDEX IF NOT EXISTS idx_edges_source_type ON edges(source_id, relationship_type)",
             "CREATE INDEX IF NOT EXISTS idx_sessions_agent ON agent_sessions(agent_name)"
         ]
         
@@ -118,61 +301,240 @@ class GraphDB:
         
         self.conn.commit()
     
+    @contextmanager
+    def _txn(self):
+        """Group writes into a single transaction (commit once on exit)"""
+        self._txn_depth += 1
+        try:
+            yield
+        except Exception:
+            self._txn_depth -= 1
+            if self._txn_depth == 0:
+                self.conn.rollback()
+            raise
+        else:
+            self._txn_depth -= 1
+            if self._txn_depth == 0:
+                self.conn.commit()
+    
+    def _commit(self):
+        """Commit unless an outer _txn() will commit for us"""
+        if self._txn_depth == 0:
+            self.conn.commit()
+    
     def add_node(self, node_type: str, properties: Dict[str, Any], 
-                 node_id: Optional[str] = None) -> str:
+                 node_id: Optional[str] = None, now: Optional[str] = None) -> str:
         """Add a node to the graph"""
         node_id = node_id or str(uuid.uuid4())
-        now = datetime.now().isoformat()
-        
-        self.conn.execute('''
-            INSERT OR REPLACE INTO nodes (id, node_type, properties, created_at, updated_at)
-            VALUES (?, ?, ?, ?, ?)
-        ''', (node_id, node_type, json.dumps(properties), now, now))
+        now = now or datetime.now().isoformat()
         
-        self.conn.commit()
+        self.add_nodes_bulk([(node_id, node_type, _jdumps(properties), now, now)])
         return node_id
     
     def add_edge(self, source_id: str, target_id: str, relationship_type: str,
-                 properties: Optional[Dict[str, Any]] = None, weight: float = 1.0) -> str:
+                 properties: Optional[Dict[str, Any]] = None, weight: float = 1.0,
+                 now: Optional[str] = None) -> str:
         """Add an edge/relationship to the graph"""
         edge_id = str(uuid.uuid4())
         properties = properties or {}
-        now = datetime.now().isoformat()
+        now = now or datetime.now().isoformat()
         
-        self.conn.execute('''
+        self.add_edges_bulk([
+            (edge_id, source_id, target_id, relationship_type, _jdumps(properties), weight, now)
+        ])
+        return edge_id
+    
+    def add_nodes_bulk(self, rows: List[Tuple]):
+        """Insert node rows (id, node_type, properties_json, created_at, updated_at)"""
+        self.conn.executemany('''
+            INSERT OR REPLACE INTO nodes (id, node_type, properties, created_at, updated_at)
+            VALUES (?, ?, ?, ?, ?)
+        ''', rows)
+        self._commit()
+    
+    def add_edges_bulk(self, rows: List[Tuple]):
+        """Insert edge rows (id, source_id, target_id, relationship_type, properties_json, weight, created_at)"""
+        self.conn.executemany('''
             INSERT INTO edges (id, source_id, target_id, relationship_type, properties, weight, created_at)
             VALUES (?, ?, ?, ?, ?, ?, ?)
-        ''', (edge_id, source_id, target_id, relationship_type, json.dumps(properties), weight, now))
-        
-        self.conn.commit()
-        return edge_id
+        ''', rows)
+        self._commit()
+    
+    def bulk_insert(self, nodes: List[Tuple[str, str, Dict[str, Any]]],
+                    edges: List[Tuple[str, str, str, float]]) -> List[str]:
+        """Insert nodes (id, type, properties) and edges (source, target, type, weight) in one transaction"""
+        now = datetime.now().isoformat()
+        edge_ids = [str(uuid.uuid4()) for _ in edges]
+        
+        with self._txn():
+            self.add_nodes_bulk([
+                (node_id, node_type, _jdumps(properties), now, now)
+                for node_id, node_type, properties in nodes
+            ])
+            self.add_edges_bulk([
+                (edge_id, source_id, target_id, relationship_type, '{}', weight, now)
+                for edge_id, (source_id, target_id, relationship_type, weight) in zip(edge_ids, edges)
+            ])
+        
+        return edge_ids
+    
+    def add_chunk_blobs(self, rows: List[Tuple[str, str]]):
+        """Insert chunk content rows (sha1_hex, content); duplicates are skipped"""
+        self.conn.executemany(
+            'INSERT OR IGNORE INTO chunk_blobs (id, content) VALUES (?, ?)', rows
+        )
+        self._commit()
+    
+    def add_chunks_bulk(self, rows: List[Tuple]):
+        """Insert knowledge chunk rows (node_id, source_path, file_type, language, size_tokens, relevance_milli)"""
+        self.conn.executemany('''
+            INSERT OR REPLACE INTO knowledge_chunks
+            (node_id, source_path, file_type, language, size_tokens, relevance_milli)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', rows)
+        self._commit()
+    
+    def _row_to_node(self, row: sqlite3.Row) -> GraphNode:
+        """Build a GraphNode from a _NODE_SELECT row"""
+        return GraphNode(
+            id=row['id'],
+            node_type=row['node_type'],
+            properties=_node_properties(row),
+            created_at=row['created_at'],
+            updated_at=row['updated_at']
+        )
     
     def get_node(self, node_id: str) -> Optional[GraphNode]:
         """Get a node by ID"""
-        cursor = self.conn.execute('SELECT * FROM nodes WHERE id = ?', (node_id,))
-        row = cursor.fetchone()
+        if self._cached_reads_depth:
+            self._validate_caches()
+            if node_id in self._node_cache:
+                row = self._node_cache[node_id]
+            else:
+                row = self.conn.execute(_NODE_SELECT + ' WHERE n.id = ?', (node_id,)).fetchone()
+                _cache_put(self._node_cache, node_id, row, _NODE_CACHE_SIZE)
+        else:
+            row = self.conn.execute(_NODE_SELECT + ' WHERE n.id = ?', (node_id,)).fetchone()
         
-        if row:
-            return GraphNode(
-                id=row['id'],
-                node_type=row['node_type'],
-                properties=json.loads(row['properties']),
-                created_at=row['created_at'],
-                updated_at=row['updated_at']
-            )
-        return None
+        return self._row_to_node(row) if row else None
+    
+    def get_nodes(self, node_ids: List[str]) -> Dict[str, GraphNode]:
+        """Get many nodes by ID in batched IN queries (missing IDs are omitted)"""
+        nodes = {}
+        node_ids = list(dict.fromkeys(node_ids))
+        
+        for i in range(0, len(node_ids), _SQL_BATCH_SIZE):
+            batch = node_ids[i:i + _SQL_BATCH_SIZE]
+            placeholders = ', '.join('?' * len(batch))
+            cursor = self.conn.execute(_NODE_SELECT + f' WHERE n.id IN ({placeholders})', batch)
+            for row in cursor:
+                nodes[row['id']] = self._row_to_node(row)
+        
+        return nodes
+    
+    def get_chunk_summaries(self, node_ids: List[str]) -> Dict[str, Tuple[str, float, int]]:
+        """Get (source_path, relevance_score, size_tokens) for many chunks, skipping content and JSON decoding"""
+        summaries = {}
+        node_ids = list(dict.fromkeys(node_ids))
+        
+        for i in range(0, len(node_ids), _SQL_BATCH_SIZE):
+            batch = node_ids[i:i + _SQL_BATCH_SIZE]
+            placeholders = ', '.join('?' * len(batch))
+            cursor = self.conn.execute(f'''
+                SELECT n.id,
+                       CASE WHEN kc.node_id IS NOT NULL THEN kc.source_path
+                            ELSE COALESCE(json_extract(n.properties, '$.source_path'), 'unknown') END,
+                       {_RELEVANCE_EXPR},
+                       CASE WHEN kc.node_id IS NOT NULL THEN kc.size_tokens
+                            ELSE COALESCE(json_extract(n.properties, '$.size_tokens'), 0) END
+                FROM nodes n LEFT JOIN knowledge_chunks kc ON kc.node_id = n.id
+                WHERE n.id IN ({placeholders})
+            ''', batch)
+            for node_id, source_path, relevance_score, size_tokens in cursor:
+                summaries[node_id] = (source_path, relevance_score, size_tokens)
+        
+        return summaries
+    
+    def get_agent_chunk_nodes(self, agent_id: str,
+                              min_relevance_score: float = 0.0) -> List[GraphNode]:
+        """Get the chunks an agent learns from, filtered and ordered by relevance in SQL"""
+        cursor = self.conn.execute(f'''
+            SELECT n.*, {_CHUNK_COLUMNS}, {_RELEVANCE_EXPR} AS relevance
+            FROM edges e JOIN nodes n ON n.id = e.target_id {_CHUNK_JOINS}
+            WHERE e.source_id = ? AND e.relationship_type = 'LEARNS_FROM'
+              AND relevance >= ?
+            ORDER BY relevance DESC, e.rowid
+        ''', (agent_id, min_relevance_score))
+        return [self._row_to_node(row) for row in cursor]
+    
+    def get_related_nodes(self, node_id: str,
+                          relationship_type: Optional[str] = None) -> List[GraphNode]:
+        """Get the targets of a node's outgoing relationships in one JOIN query"""
+        query = f'''
+            SELECT n.*, {_CHUNK_COLUMNS}
+            FROM edges e JOIN nodes n ON n.id = e.target_id {_CHUNK_JOINS}
+            WHERE e.source_id = ?
+        '''
+        params = [node_id]
+        if relationship_type:
+            query += " AND e.relationship_type = ?"
+            params.append(relationship_type)
+    
+        cursor = self.conn.execute(query + " ORDER BY e.rowid", params)
+        return [self._row_to_node(row) for row in cursor]
     
     def find_nodes(self, node_type: Optional[str] = None, 
                    properties_filter: Optional[Dict[str, Any]] = None) -> List[GraphNode]:
         """Find nodes by type and/or properties"""
-        query = "SELECT * FROM nodes"
+        if not self._cached_reads_depth:
+            return [node for _, node in self._find_nodes(node_type, properties_filter)]
+        
+        self._validate_caches()
+        try:
+            key = (node_type, tuple(sorted((properties_filter or {}).items())))
+            hash(key)
+        except TypeError:  # unhashable filter values are never cached
+            return [node for _, node in self._find_nodes(node_type, properties_filter)]
+        
+        rows = self._find_cache.get(key)
+        if rows is None:
+            matches = self._find_nodes(node_type, properties_filter)
+            _cache_put(self._find_cache, key, [row for row, _ in matches], _FIND_CACHE_SIZE)
+            return [node for _, node in matches]
+        
+        return [self._row_to_node(row) for row in rows]
+    
+    def _find_nodes(self, node_type: Optional[str],
+                    properties_filter: Optional[Dict[str, Any]]) -> List[Tuple[sqlite3.Row, GraphNode]]:
+        """Query nodes by type and/or properties, returning matching (row, node) pairs"""
+        query = _NODE_SELECT
         params = []
         conditions = []
+        remaining_filter = {}
         
         if node_type:
-            conditions.append("node_type = ?")
+            conditions.append("n.node_type = ?")
             params.append(node_type)
         
+        # Push simple string equality filters down into SQL
+        for key, value in (properties_filter or {}).items():
+            if isinstance(value, str) and key.isidentifier():
+                if key == 'name':
+                    conditions.append("n.name_key = ?")  # indexed
+                    params.append(value)
+                elif key in _CHUNK_TEXT_FIELDS:
+                    conditions.append(f"COALESCE(kc.{key}, json_extract(n.properties, ?)) = ?")
+                    params.extend([f"$.{key}", value])
+                elif key == 'content':
+                    # Chunk text lives in chunk_blobs; legacy rows keep it inline
+                    conditions.append("COALESCE(b.content, json_extract(n.properties, '$.content')) = ?")
+                    params.append(value)
+                else:
+                    conditions.append("json_extract(n.properties, ?) = ?")
+                    params.extend([f"$.{key}", value])
+            else:
+                remaining_filter[key] = value
+        
         if conditions:
             query += " WHERE " + " AND ".join(conditions)
         
@@ -180,24 +542,18 @@ class GraphDB:
         nodes = []
         
         for row in cursor.fetchall():
-            node = GraphNode(
-                id=row['id'],
-                node_type=row['node_type'],
-                properties=json.loads(row['properties']),
-                created_at=row['created_at'],
-                updated_at=row['updated_at']
-            )
+            node = self._row_to_node(row)
             
-            # Apply properties filter if specified
-            if properties_filter:
+            # Apply remaining properties filter if specified
+            if remaining_filter:
                 match = all(
                     node.properties.get(key) == value 
-                    for key, value in properties_filter.items()
+                    for key, value in remaining_filter.items()
                 )
                 if match:
-                    nodes.append(node)
+                    nodes.append((row, node))
             else:
-                nodes.append(node)
+                nodes.append((row, node))
         
         return nodes
     
@@ -205,133 +561,297 @@ class GraphDB:
                          relationship_type: Optional[str] = None,
                          direction: str = "both") -> List[GraphEdge]:
         """Get relationships for a node"""
-        conditions = []
-        params = []
-        
-        if direction in ["outgoing", "both"]:
-            conditions.append("source_id = ?")
-            params.append(node_id)
-        
-        if direction in ["incoming", "both"] and direction != "outgoing":
-            if conditions:
-                conditions = [f"({' OR '.join(conditions)} OR target_id = ?)"]
-                params.append(node_id)
-            else:
-                conditions.append("target_id = ?")
-                params.append(node_id)
+        if direction not in ("outgoing", "incoming", "both"):
+            direction = None  # unknown direction: no endpoint filter
         
+        query = _EDGE_QUERIES[(direction, bool(relationship_type))]
+        params = [node_id, node_id] if direction == "both" else [node_id] if direction else []
         if relationship_type:
-            conditions.append("relationship_type = ?")
             params.append(relationship_type)
         
-        query = "SELECT * FROM edges"
-        if conditions:
-            query += " WHERE " + " AND ".join(conditions)
-        
         cursor = self.conn.execute(query, params)
-        edges = []
-        
-        for row in cursor.fetchall():
-            edges.append(GraphEdge(
-                id=row['id'],
-                source_id=row['source_id'],
-                target_id=row['target_id'],
-                relationship_type=row['relationship_type'],
-                properties=json.loads(row['properties']),
-                weight=row['weight'],
-                created_at=row['created_at']
-            ))
+        return [self._row_to_edge(row) for row in cursor.fetchall()]
+    
+    def get_relationships_bulk(self, node_ids: List[str],
+                               relationship_type: Optional[str] = None,
+                               direction: str = "both") -> Dict[str, List[GraphEdge]]:
+        """Get relationships for many nodes at once, grouped by node ID"""
+        node_ids = list(dict.fromkeys(node_ids))
+        edges_by_node: Dict[str, List[GraphEdge]] = {node_id: [] for node_id in node_ids}
+        
+        columns = {
+            "outgoing": ["source_id"],
+            "incoming": ["target_id"],
+            "both": ["source_id", "target_id"],
+        }.get(direction, [])
+        if not columns:
+            return edges_by_node
+        
+        for i in range(0, len(node_ids), _SQL_BATCH_SIZE):
+            batch = node_ids[i:i + _SQL_BATCH_SIZE]
+            placeholders = ', '.join('?' * len(batch))
+            conditions = " OR ".join(f"{column} IN ({placeholders})" for column in columns)
+            query = f"SELECT * FROM edges WHERE ({conditions})"
+            params = batch * len(columns)
+            if relationship_type:
+                query += " AND relationship_type = ?"
+                params.append(relationship_type)
+            
+            for row in self.conn.execute(query, params):
+                edge = self._row_to_edge(row)
+                for node_id in {row[column] for column in columns}:
+                    if node_id in edges_by_node:
+                        edges_by_node[node_id].append(edge)
         
-        return edges
+        return edges_by_node
+    
+    def get_all_outgoing(self, source_id: str) -> Dict[str, List[GraphEdge]]:
+        """Get all outgoing relationships of a node in one query, grouped by type"""
+        edges_by_type: Dict[str, List[GraphEdge]] = {}
+        for row in self.conn.execute(_EDGE_QUERIES[("outgoing", False)], (source_id,)):
+            edges_by_type.setdefault(row['relationship_type'], []).append(self._row_to_edge(row))
+        return edges_by_type
+    
+    def _row_to_edge(self, row: sqlite3.Row) -> GraphEdge:
+        """Build a GraphEdge from an edges row"""
+        return GraphEdge(
+            id=row['id'],
+            source_id=row['source_id'],
+            target_id=row['target_id'],
+            relationship_type=row['relationship_type'],
+            properties=_jloads(row['properties']),
+            weight=row['weight'],
+            created_at=row['created_at']
+        )
     
     def store_extraction_result(self, result: ExtractionResult, 
                                agent_profile: AgentProfile) -> str:
         """Store extraction result in knowledge graph"""
         print(f"📊 Storing extraction result for {agent_profile.name}")
         
+        with self._txn():
+            session_id = self._store_extraction_result(result, agent_profile)
+        
+        print(f"✅ Stored {len(result.chunks)} knowledge chunks in graph")
+        return session_id
+    
+    def store_chunks_streaming(self, chunks: Iterable[KnowledgeChunk], agent_profile: AgentProfile,
+                               source_id: str, source_type: str,
+                               extraction_metadata: Optional[Dict[str, Any]] = None,
+                               batch_size: int = 1000) -> str:
+        """Store chunks from an iterator, committing every batch_size chunks"""
+        print(f"📊 Streaming extraction result for {agent_profile.name}")
+        now = datetime.now().isoformat()
+        extraction_metadata = extraction_metadata or {}
+        linked_nodes: Dict[str, Dict[str, str]] = {"Technology": {}, "Skill": {}}
+        total_chunks = total_tokens = 0
+        
+        with self._txn():
+            session_id, agent_id, source_node_id = self._start_session(
+                source_id, source_type, 0, 0, extraction_metadata, agent_profile, now
+            )
+        
+        chunks = iter(chunks)
+        try:
+            while batch := list(islice(chunks, batch_size)):
+                with self._txn():
+                    self._store_chunks(batch, agent_profile, session_id, agent_id,
+                                       source_node_id, now, linked_nodes)
+                total_chunks += len(batch)
+                total_tokens += sum(chunk.size_tokens for chunk in batch)
+        except Exception:
+            # Don't leave a half-stored session behind - drop the batches already committed
+            with self._txn():
+                self._delete_session(session_id, source_node_id, linked_nodes)
+            print(f"❌ Streaming failed after {total_chunks} chunks, removed partial session")
+            raise
+
+        # Totals are only known once the stream is exhausted
+        with self._txn():
+            self.conn.execute(
+                "UPDATE agent_sessions SET total_chunks = ?, total_tokens = ? WHERE id = ?",
+                (total_chunks, total_tokens, session_id)
+            )
+            self.conn.execute(
+                "UPDATE nodes SET properties = json_set(properties, '$.total_chunks', ?, '$.total_tokens', ?) "
+                "WHERE id = ?",
+                (total_chunks, total_tokens, source_node_id)
+            )
+        
+        print(f"✅ Stored {total_chunks} knowledge chunks in graph")
+        return session_id
+    
+    def _delete_session(self, session_id: str, source_id: str,
+                        linked_nodes: Dict[str, Dict[str, str]]):
+        """Remove a session with its Source, chunk, technology and skill nodes and their edges"""
+        node_ids = [source_id]
+        node_ids += [row[0] for row in self.conn.execute(
+            "SELECT target_id FROM edges WHERE source_id = ? AND relationship_type = 'CONTAINS'",
+            (source_id,)
+        )]
+        for nodes_by_name in linked_nodes.values():
+            node_ids += nodes_by_name.values()
+    
+        for i in range(0, len(node_ids), _SQL_BATCH_SIZE):
+            batch = node_ids[i:i + _SQL_BATCH_SIZE]
+            placeholders = ', '.join('?' * len(batch))
+            self.conn.execute(
+                f"DELETE FROM edges WHERE source_id IN ({placeholders}) OR target_id IN ({placeholders})",
+                batch * 2
+            )
+            self.conn.execute(f"DELETE FROM knowledge_chunks WHERE node_id IN ({placeholders})", batch)
+            self.conn.execute(f"DELETE FROM nodes WHERE id IN ({placeholders})", batch)
+    
+        self.conn.execute("DELETE FROM agent_sessions WHERE id = ?", (session_id,))
+    
+        # Blobs are shared across sources - only drop the ones nothing references any more
+        self.conn.execute('''
+            DELETE FROM chunk_blobs WHERE id NOT IN (
+                SELECT json_extract(properties, '$.content_sha1') FROM nodes
+                WHERE node_type = 'KnowledgeChunk'
+                  AND json_extract(properties, '$.content_sha1') IS NOT NULL
+            )
+        ''')
+    
+    def _store_extraction_result(self, result: ExtractionResult,
+                                 agent_profile: AgentProfile) -> str:
+        """Build all node/edge rows for a result and insert them in bulk"""
+        now = datetime.now().isoformat()
+        session_id, agent_id, source_node_id = self._start_session(
+            result.source_id, result.source_type, result.total_chunks, result.total_tokens,
+            result.extraction_metadata, agent_profile, now
+        )
+        self._store_chunks(result.chunks, agent_profile, session_id, agent_id, source_node_id,
+                           now, {"Technology": {}, "Skill": {}})
+        return session_id
+    
+    def _start_session(self, source_url: str, source_type: str, total_chunks: int,
+                       total_tokens: int, extraction_metadata: Dict[str, Any],
+                       agent_profile: AgentProfile, now: str) -> Tuple[str, str, str]:
+        """Record an agent session and its Source node; returns (session, agent, source) IDs"""
         # Create agent session
         session_id = str(uuid.uuid4())
-        now = datetime.now().isoformat()
         
         self.conn.execute('''
             INSERT INTO agent_sessions 
             (id, agent_name, source_id, source_type, total_chunks, total_tokens, extraction_metadata, created_at)
             VALUES (?, ?, ?, ?, ?, ?, ?, ?)
         ''', (
-            session_id, agent_profile.name, result.source_id, result.source_type,
-            result.total_chunks, result.total_tokens, 
-            json.dumps(result.extraction_metadata), now
+            session_id, agent_profile.name, source_url, source_type,
+            total_chunks, total_tokens, 
+            _jdumps(extraction_metadata), now
         ))
         
         # Create agent node if not exists
-        agent_id = self._ensure_agent_node(agent_profile)
+        agent_id = self._ensure_agent_node(agent_profile, now)
         
         # Create source node
         source_id = self.add_node("Source", {
-            "url": result.source_id,
-            "source_type": result.source_type,
-            "total_chunks": result.total_chunks,
-            "total_tokens": result.total_tokens,
-            "metadata": result.extraction_metadata
-        })
+            "url": source_url,
+            "source_type": source_type,
+            "total_chunks": total_chunks,
+            "total_tokens": total_tokens,
+            "metadata": extraction_metadata
+        }, now=now)
         
         # Create agent -> source relationship
         self.add_edge(agent_id, source_id, "EXTRACTS_FROM", {
             "session_id": session_id,
             "extraction_date": now
-        })
+        }, now=now)
+        
+        return session_id, agent_id, source_id
+    
+    def _store_chunks(self, chunks: Iterable[KnowledgeChunk], agent_profile: AgentProfile,
+                      session_id: str, agent_id: str, source_id: str, now: str,
+                      linked_nodes: Dict[str, Dict[str, str]]):
+        """Build node/edge rows for chunks and their technologies/skills and insert them in bulk
+        
+        linked_nodes maps "Technology"/"Skill" names to node IDs already created for this session.
+        """
+        node_rows = []
+        edge_rows = []
+        blob_rows = []
+        chunk_rows = []
+        
+        def node(node_type: str, properties: Dict[str, Any]) -> str:
+            node_id = str(uuid.uuid4())
+            node_rows.append((node_id, node_type, _jdumps(properties), now, now))
+            return node_id
+        
+        def edge(source: str, target: str, relationship_type: str,
+                 properties: Optional[Dict[str, Any]] = None, weight: float = 1.0):
+            edge_rows.append((str(uuid.uuid4()), source, target, relationship_type,
+                              _jdumps(properties or {}), weight, now))
         
         # Process knowledge chunks
-        technology_nodes = {}
-        skill_nodes = {}
+        technology_nodes = linked_nodes["Technology"]
+        skill_nodes = linked_nodes["Skill"]
+        
+        # One matcher for all technologies and skill keywords, so each
+        # chunk's content is lowercased and scanned exactly once
+        technologies = [(tech, tech.lower()) for tech in agent_profile.technologies]
+        skill_filters = [
+            (skill_category, keywords, [keyword.lower() for keyword in keywords])
+            for skill_category, keywords in agent_profile.knowledge_filters.items()
+        ]
+        matcher = KeywordMatcher.for_keywords(
+            tuple(agent_profile.technologies) +
+            tuple(kw for keywords in agent_profile.knowledge_filters.values() for kw in keywords)
+        )
         
-        for chunk in result.chunks:
+        for chunk in chunks:
+            found = matcher.find(chunk.content.lower())
+            
+            # Store content once by hash; identical chunks dedupe across sources
+            content_sha1 = hashlib.sha1(chunk.content.encode()).hexdigest()
+            blob_rows.append((content_sha1, chunk.content))
+            
             # Create knowledge chunk node
-            chunk_id = self.add_node("KnowledgeChunk", {
-                "content": chunk.content,
-                "source_path": chunk.source_path,
-                "file_type": chunk.file_type,
-                "language": chunk.language,
-                "size_tokens": chunk.size_tokens,
-                "relevance_score": chunk.relevance_score,
+            chunk_id = node("KnowledgeChunk", {
+                "content_sha1": content_sha1,
                 "metadata": chunk.metadata
             })
+            chunk_rows.append((
+                chunk_id, chunk.source_path, chunk.file_type, chunk.language,
+                chunk.size_tokens, round(chunk.relevance_score * 1000)
+            ))
             
             # Create source -> chunk relationship
-            self.add_edge(source_id, chunk_id, "CONTAINS", weight=chunk.relevance_score)
+            edge(source_id, chunk_id, "CONTAINS", weight=chunk.relevance_score)
             
             # Create agent -> chunk relationship
-            self.add_edge(agent_id, chunk_id, "LEARNS_FROM", {
+            edge(agent_id, chunk_id, "LEARNS_FROM", {
                 "relevance_score": chunk.relevance_score,
                 "session_id": session_id
             }, weight=chunk.relevance_score)
             
             # Extract and link technologies
-            for tech in agent_profile.technologies:
-                if tech.lower() in chunk.content.lower():
+            for tech, tech_lower in technologies:
+                if tech_lower in found:
                     if tech not in technology_nodes:
-                        tech_id = self.add_node("Technology", {
+                        tech_id = node("Technology", {
                             "name": tech,
                             "agent_context": agent_profile.name
                         })
                         technology_nodes[tech] = tech_id
                         
                         # Create agent -> technology relationship
-                        self.add_edge(agent_id, tech_id, "REQUIRES")
+                        edge(agent_id, tech_id, "REQUIRES")
                     
                     # Create chunk -> technology relationship
-                    self.add_edge(chunk_id, technology_nodes[tech], "IMPLEMENTS")
+                    edge(chunk_id, technology_nodes[tech], "IMPLEMENTS")
             
             # Extract and link skills based on knowledge filters
-            for skill_category, keywords in agent_profile.knowledge_filters.items():
+            for skill_category, keywords, keywords_lower in skill_filters:
                 skill_score = sum(
-                    1 for keyword in keywords 
-                    if keyword.lower() in chunk.content.lower()
+                    1 for keyword in keywords_lower 
+                    if keyword in found
                 ) / len(keywords) if keywords else 0
                 
                 if skill_score > 0.1:  # Minimum relevance threshold
                     if skill_category not in skill_nodes:
-                        skill_id = self.add_node("Skill", {
+                        skill_id = node("Skill", {
                             "name": skill_category,
                             "keywords": keywords,
                             "agent_context": agent_profile.name
@@ -339,23 +859,27 @@ class GraphDB:
                         skill_nodes[skill_category] = skill_id
                         
                         # Create agent -> skill relationship
-                        self.add_edge(agent_id, skill_id, "SPECIALIZES_IN")
+                        edge(agent_id, skill_id, "SPECIALIZES_IN")
                     
                     # Create chunk -> skill relationship
-                    self.add_edge(chunk_id, skill_nodes[skill_category], "DEMONSTRATES", 
-                                weight=skill_score)
+                    edge(chunk_id, skill_nodes[skill_category], "DEMONSTRATES", 
+                         weight=skill_score)
         
-        self.conn.commit()
-        print(f"✅ Stored {len(result.chunks)} knowledge chunks in graph")
-        return session_id
+        self.add_chunk_blobs(blob_rows)
+        self.add_nodes_bulk(node_rows)
+        self.add_chunks_bulk(chunk_rows)
+        self.add_edges_bulk(edge_rows)
     
-    def _ensure_agent_node(self, agent_profile: AgentProfile) -> str:
+    def _ensure_agent_node(self, agent_profile: AgentProfile, now: Optional[str] = None) -> str:
         """Ensure agent node exists in graph"""
-        # Check if agent node exists
-        existing_agents = self.find_nodes("Agent", {"name": agent_profile.name})
+        # Check if agent node exists (indexed lookup, no JSON decoding)
+        row = self.conn.execute(
+            "SELECT id FROM nodes WHERE node_type = 'Agent' AND name_key = ? LIMIT 1",
+            (agent_profile.name,)
+        ).fetchone()
         
-        if existing_agents:
-            return existing_agents[0].id
+        if row:
+            return row['id']
         
         # Create new agent node
         return self.add_node("Agent", {
@@ -367,10 +891,51 @@ class GraphDB:
             "technologies": agent_profile.technologies,
             "focus_areas": agent_profile.focus_areas,
             "domain_expertise": agent_profile.role.domain_expertise
-        })
+        }, now=now)
+    
+    def _data_version(self) -> Tuple[int, int]:
+        """Changes whenever this or any other connection modifies the database"""
+        other_commits = self.conn.execute('PRAGMA data_version').fetchone()[0]
+        return other_commits, self.conn.total_changes
+    
+    def _validate_caches(self):
+        """Drop cached reads if the database changed since they were made"""
+        if self._cached_reads_depth and self._cache_version is not None:
+            # Inside cached_reads(): outside writes were checked on entry, only
+            # this connection's own writes (no query needed) can change things
+            version = (self._cache_version[0], self.conn.total_changes)
+        else:
+            version = self._data_version()
+        if version != self._cache_version:
+            self._graph_cache.clear()
+            self._node_cache.clear()
+            self._find_cache.clear()
+            self._cache_version = version
+    
+    @contextmanager
+    def cached_reads(self):
+        """Serve repeated get_node/find_nodes calls from caches, checking for outside writes once on entry"""
+        if not self._cached_reads_depth:
+            self._validate_caches()
+        self._cached_reads_depth += 1
+        try:
+            yield self
+        finally:
+            self._cached_reads_depth -= 1
     
     def get_agent_knowledge_graph(self, agent_name: str) -> nx.Graph:
-        """Get NetworkX graph for an agent's knowledge"""
+        """Get NetworkX graph for an agent's knowledge (cached until the database changes)"""
+        self._validate_caches()
+        graph = self._graph_cache.get(agent_name)
+        if graph is None:
+            graph = self._build_agent_knowledge_graph(agent_name)
+            _cache_put(self._graph_cache, agent_name, graph, _GRAPH_CACHE_SIZE)
+        
+        # Callers get their own copy to modify
+        return graph.copy()
+    
+    def _build_agent_knowledge_graph(self, agent_name: str) -> nx.Graph:
+        """Load an agent's knowledge graph from the database"""
         G = nx.Graph()
         
         # Get agent node
@@ -383,27 +948,36 @@ class GraphDB:
         # Add agent node
         G.add_node(agent_id, **agents[0].properties, node_type="Agent")
         
-        # Get all relationships from agent
-        relationships = self.get_relationships(agent_id, direction="outgoing")
-        
-        for edge in relationships:
-            target_node = self.get_node(edge.target_id)
-            if target_node:
-                G.add_node(edge.target_id, **target_node.properties, 
-                          node_type=target_node.node_type)
-                G.add_edge(agent_id, edge.target_id, 
-                          relationship_type=edge.relationship_type,
-                          weight=edge.weight, **edge.properties)
+        # Stream every outgoing edge together with its target node in one query
+        cursor = self.conn.execute(f'''
+            SELECT e.target_id, e.relationship_type, e.weight, e.properties AS edge_properties,
+                   n.node_type, n.properties, {_CHUNK_COLUMNS}
+            FROM edges e
+            JOIN nodes n ON n.id = e.target_id
+            {_CHUNK_JOINS}
+            WHERE e.source_id = ?
+        ''', (agent_id,))
+        
+        for row in cursor:
+            G.add_node(row['target_id'], **_node_properties(row), 
+                      node_type=row['node_type'])
+            G.add_edge(agent_id, row['target_id'], 
+                      relationship_type=row['relationship_type'],
+                      weight=row['weight'], **_jloads(row['edge_properties']))
         
         return G
     
+    def count_nodes_by_type(self) -> Dict[str, int]:
+        """Count nodes per node type in one grouped query"""
+        cursor = self.conn.execute('SELECT node_type, COUNT(*) as count FROM nodes GROUP BY node_type')
+        return dict(cursor.fetchall())
+    
     def get_knowledge_statistics(self, agent_name: Optional[str] = None) -> Dict[str, Any]:
         """Get knowledge graph statistics"""
         stats = {}
         
         # Node counts by type
-        cursor = self.conn.execute('SELECT node_type, COUNT(*) as count FROM nodes GROUP BY node_type')
-        stats['node_counts'] = dict(cursor.fetchall())
+        stats['node_counts'] = self.count_nodes_by_type()
         
         # Edge counts by type
         cursor = self.conn.execute('SELECT relationship_type, COUNT(*) as count FROM edges GROUP BY relationship_type')
@@ -431,5 +1005,7 @@ class GraphDB:
     def close(self):
         """Close database connection"""
         if self.conn:
+            if not self.read_only:
+                self.conn.execute("PRAGMA optimize")
             self.conn.close()
             self.conn = None
\ No newline at end of file
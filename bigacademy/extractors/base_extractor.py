@@ -4,11 +4,89 @@ Base Knowledge Extractor - Generic extraction interface
 """
 
 from abc import ABC, abstractmethod
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Callable
 from dataclasses import dataclass
-from pathlib import Path
+from functools import lru_cache
+from operator import attrgetter
+from types import MappingProxyType
+import fnmatch
+import heapq
+import os
+import re
 
-@dataclass
+try:
+    import ahocorasick  # optional: single-pass multi-keyword matching
+except ImportError:
+    ahocorasick = None
+
+# File extension -> language, shared by all extractors
+_EXTENSION_MAP = MappingProxyType({
+    '.py': 'python',
+    '.js': 'javascript', 
+    '.ts': 'typescript',
+    '.jsx': 'jsx',
+    '.tsx': 'tsx',
+    '.java': 'java',
+    '.cpp': 'cpp',
+    '.c': 'c',
+    '.go': 'go',
+    '.rs': 'rust',
+    '.php': 'php',
+    '.rb': 'ruby',
+    '.swift': 'swift',
+    '.kt': 'kotlin',
+    '.scala': 'scala',
+    '.yaml': 'yaml',
+    '.yml': 'yaml',
+    '.json': 'json',
+    '.xml': 'xml',
+    '.html': 'html',
+    '.css': 'css',
+    '.sql': 'sql',
+    '.sh': 'bash',
+    '.md': 'markdown',
+    '.rst': 'rst',
+    '.txt': 'text'
+})
+
+def _suffix(file_path: str) -> str:
+    """Lowercased file extension, as Path(file_path).suffix.lower() but without building a Path"""
+    name = os.path.basename(file_path)
+    dot = name.rfind('.')
+    return name[dot:].lower() if 0 < dot < len(name) - 1 else ''
+
+@lru_cache(maxsize=64)
+def _compile_patterns(patterns: Tuple[str, ...]) -> Optional[re.Pattern]:
+    """Compile a set of glob patterns into one regex (None if there are none)"""
+    if not patterns:
+        return None
+    return re.compile('|'.join(
+        fnmatch.translate(os.path.normcase(pattern)) for pattern in patterns
+    ))
+
+@lru_cache(maxsize=64)
+def _pattern_filter(include_patterns: Tuple[str, ...],
+                    exclude_patterns: Tuple[str, ...]) -> Callable[[str], bool]:
+    """Build a path predicate from include/exclude globs (compiled once per pattern set)"""
+    include_re = _compile_patterns(include_patterns)
+    exclude_re = _compile_patterns(exclude_patterns)
+    
+    def matches(file_path: str) -> bool:
+        file_path = os.path.normcase(file_path)
+        
+        # Check exclude patterns first
+        if exclude_re is not None and exclude_re.match(file_path):
+            return False
+        
+        # If no include patterns, include by default
+        if include_re is None:
+            return True
+        
+        return include_re.match(file_path) is not None
+    
+    return matches
+
+@dataclass(slots=True)
 class KnowledgeChunk:
     """Extracted knowledge chunk with metadata"""
     content: str
@@ -28,6 +106,49 @@ class ExtractionResult:
     total_tokens: int
     chunks: List[KnowledgeChunk]
     extraction_metadata: Dict[str, Any]
+    
+    def top_k(self, k: int) -> List[KnowledgeChunk]:
+        """The k most relevant chunks, without sorting the full list"""
+        return heapq.nlargest(k, self.chunks, key=attrgetter('relevance_score'))
+
+class KeywordMatcher:
+    """Find which of a fixed set of keywords occur in lowercased content"""
+    
+    def __init__(self, keywords: Tuple[str, ...]):
+        self.keywords = frozenset(keyword.lower() for keyword in keywords)
+        self._automaton = None
+        
+        # Aho-Corasick finds every keyword in one pass over the content
+        searchable = [keyword for keyword in self.keywords if keyword]
+        if ahocorasick is not None and searchable:
+            self._automaton = ahocorasick.Automaton()
+            for keyword in searchable:
+                self._automaton.add_word(keyword, keyword)
+            self._automaton.make_automaton()
+        
+        # Without an automaton, prefilter by character presence: a keyword
+        # can only occur if every one of its characters occurs in the content
+        self._keyword_chars = [(keyword, frozenset(keyword)) for keyword in self.keywords]
+    
+    @classmethod
+    @lru_cache(maxsize=64)
+    def for_keywords(cls, keywords: Tuple[str, ...]) -> 'KeywordMatcher':
+        """Get a (cached) matcher for a keyword tuple"""
+        return cls(keywords)
+    
+    def find(self, content_lower: str) -> set:
+        """Return the keywords present in content (which must already be lowercased)"""
+        if self._automaton is None:
+            content_chars = set(content_lower)
+            return {
+                keyword for keyword, chars in self._keyword_chars
+                if chars <= content_chars and keyword in content_lower
+            }
+        
+        found = {keyword for _, keyword in self._automaton.iter(content_lower)}
+        if '' in self.keywords:
+            found.add('')  # an empty keyword matches everything, as with `in`
+        return found
 
 class BaseExtractor(ABC):
     """Abstract base class for knowledge extractors"""
@@ -49,23 +170,12 @@ class BaseExtractor(ABC):
                           include_patterns: List[str], 
                           exclude_patterns: List[str]) -> bool:
         """Filter files by include/exclude patterns"""
-        import fnmatch
-        
-        # Check exclude patterns first
-        for pattern in exclude_patterns:
-            if fnmatch.fnmatch(file_path, pattern):
-                return False
-        
-        # If no include patterns, include by default
-        if not include_patterns:
-            return True
-        
-        # Check include patterns
-        for pattern in include_patterns:
-            if fnmatch.fnmatch(file_path, pattern):
-                return True
-        
-        return False
+        return self.pattern_filter(include_patterns, exclude_patterns)(file_path)
+    
+    def pattern_filter(self, include_patterns: List[str],
+                       exclude_patterns: List[str]) -> Callable[[str], bool]:
+        """Get a reusable predicate equivalent to filter_by_patterns for fixed patterns"""
+        return _pattern_filter(tuple(include_patterns), tuple(exclude_patterns))
     
     def calculate_relevance_score(self, content: str, 
                                 filters: Dict[str, List[str]]) -> float:
@@ -73,14 +183,17 @@ class BaseExtractor(ABC):
         if not filters:
             return 1.0
         
-        content_lower = content.lower()
+        matcher = KeywordMatcher.for_keywords(
+            tuple(keyword for keywords in filters.values() for keyword in keywords)
+        )
+        found = matcher.find(content.lower())
         total_score = 0.0
         total_weight = len(filters)
         
         for category, keywords in filters.items():
             category_score = 0.0
             for keyword in keywords:
-                if keyword.lower() in content_lower:
+                if keyword.lower() in found:
                     category_score += 1.0
             
             # Normalize by number of keywords in category
@@ -93,39 +206,17 @@ class BaseExtractor(ABC):
     
     def detect_language(self, file_path: str) -> Optional[str]:
         """Detect programming language from file extension"""
-        extension_map = {
-            '.py': 'python',
-            '.js': 'javascript', 
-            '.ts': 'typescript',
-            '.jsx': 'jsx',
-            '.tsx': 'tsx',
-            '.java': 'java',
-            '.cpp': 'cpp',
-            '.c': 'c',
-            '.go': 'go',
-            '.rs': 'rust',
-            '.php': 'php',
-            '.rb': 'ruby',
-            '.swift': 'swift',
-            '.kt': 'kotlin',
-            '.scala': 'scala',
-            '.yaml': 'yaml',
-            '.yml': 'yaml',
-            '.json': 'json',
-            '.xml': 'xml',
-            '.html': 'html',
-            '.css': 'css',
-            '.sql': 'sql',
-            '.sh': 'bash',
-            '.md': 'markdown',
-            '.rst': 'rst',
-            '.txt': 'text'
-        }
-        
-        suffix = Path(file_path).suffix.lower()
-        return extension_map.get(suffix)
+        return _EXTENSION_MAP.get(_suffix(file_path))
     
     def count_tokens(self, text: str) -> int:
         """Estimate token count (rough approximation)"""
         # Simple token estimation: ~4 characters per token
-        return len(text) // 4
\ No newline at end of file
+        return len(text) // 4
+    
+    def count_tokens_batch(self, texts: List[str]) -> List[int]:
+        """Estimate token counts for many texts in one pass"""
+        return [len(text) >> 2 for text in texts]
+    
+    def count_tokens_bytes(self, data: bytes) -> int:
+        """Estimate token count from raw bytes without decoding them"""
+        return len(data) >> 2
@@ -4,23 +4,47 @@ GitHub Repository Knowledge Extractor
 Wraps gpt-repository-loader with agent-specific intelligence
 """
 
+import os
+import hashlib
 import tempfile
+import threading
+import time
 import subprocess
 import shutil
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from contextlib import contextmanager
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Iterator, Tuple, Callable
 import gpt_repository_loader
 
-from .base_extractor import BaseExtractor, KnowledgeChunk, ExtractionResult
+from .base_extractor import BaseExtractor, KnowledgeChunk, ExtractionResult, _suffix
 from ..core.agent_profiles import AgentProfile
 
+DEFAULT_CACHE_DIR = "~/.cache/bigacademy/repos"
+FETCHED_MARKER = "bigacademy-fetched"  # touched in .git after each successful clone/update
+STREAM_BATCH_SIZE = 256  # files per token-counting batch when streaming chunks
+
 class GitHubExtractor(BaseExtractor):
     """Extract knowledge from GitHub repositories with agent-specific filtering"""
     
     def __init__(self, config: Optional[Dict[str, Any]] = None):
         super().__init__(config)
         self.clone_depth = config.get('clone_depth', 1) if config else 1
-        self.timeout = config.get('timeout', 300) if config else 300
+        # Shallow clones finish in seconds: prefer a short timeout plus retries
+        default_timeout = int(os.environ.get('GIT_CLONE_TIMEOUT', 60))
+        self.timeout = config.get('timeout', default_timeout) if config else default_timeout
+        self.clone_retries = max(1, config.get('clone_retries', 3) if config else 3)
+        self.partial_clone = config.get('partial_clone', True) if config else True
+        self.max_parallel = config.get('max_parallel', 4) if config else 4
+        
+        # Persistent clones keyed by URL hash; set cache_dir to None to always clone fresh
+        cache_dir = config.get('cache_dir', DEFAULT_CACHE_DIR) if config else DEFAULT_CACHE_DIR
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
+        # Cached clones refreshed less than this many seconds ago are used as-is
+        self.cache_max_age = config.get('cache_max_age', 0) if config else 0
+        self._cache_locks: Dict[Path, threading.Lock] = {}
+        self._cache_locks_guard = threading.Lock()
     
     def validate_source(self, source: str) -> bool:
         """Validate GitHub repository URL"""
@@ -31,20 +55,26 @@ class GitHubExtractor(BaseExtractor):
         ]
         return any(pattern in source for pattern in github_patterns)
     
+    def extraction_metadata(self, source: str, agent_profile: Optional[AgentProfile] = None) -> Dict[str, Any]:
+        """Metadata recorded with a successful extraction of source"""
+        return {
+            "repository_url": source,
+            "clone_depth": self.clone_depth,
+            "agent_profile": agent_profile.name if agent_profile else None,
+            "extraction_method": "gpt_repository_loader"
+        }
+    
     def extract(self, source: str, agent_profile: Optional[AgentProfile] = None, **kwargs) -> ExtractionResult:
         """Extract knowledge from GitHub repository"""
         
         if not self.validate_source(source):
             raise ValueError(f"Invalid GitHub source: {source}")
         
-        # Create temporary directory for cloning
-        with tempfile.TemporaryDirectory() as temp_dir:
-            repo_path = Path(temp_dir) / "repository"
-            
+        # Work in the persistent repo cache, or a temporary directory without one
+        with self._repository_dir(source) as repo_path:
             try:
-                # Clone repository
-                print(f"📥 Cloning repository: {source}")
-                self._clone_repository(source, repo_path)
+                # Clone repository (or refresh the cached clone)
+                self._fetch_repository(source, repo_path)
                 
                 # Extract with gpt-repository-loader
                 print(f"📝 Extracting repository content...")
@@ -63,12 +93,7 @@ class GitHubExtractor(BaseExtractor):
                     total_chunks=len(chunks),
                     total_tokens=total_tokens,
                     chunks=chunks,
-                    extraction_metadata={
-                        "repository_url": source,
-                        "clone_depth": self.clone_depth,
-                        "agent_profile": agent_profile.name if agent_profile else None,
-                        "extraction_method": "gpt_repository_loader"
-                    }
+                    extraction_metadata=self.extraction_metadata(source, agent_profile)
                 )
                 
             except Exception as e:
@@ -82,24 +107,150 @@ class GitHubExtractor(BaseExtractor):
                     extraction_metadata={"error": str(e)}
                 )
     
+    def iter_chunks(self, source: str, agent_profile: Optional[AgentProfile] = None) -> Iterator[KnowledgeChunk]:
+        """Extract knowledge from GitHub repository, yielding chunks in file order (unsorted)"""
+        
+        if not self.validate_source(source):
+            raise ValueError(f"Invalid GitHub source: {source}")
+        
+        # The checkout is only needed until the repository dump has been read
+        try:
+            with self._repository_dir(source) as repo_path:
+                self._fetch_repository(source, repo_path)
+                
+                print(f"📝 Extracting repository content...")
+                raw_content = self._extract_with_gpt_loader(repo_path, agent_profile)
+        except Exception as e:
+            print(f"❌ Extraction failed: {e}")
+            return
+        
+        print(f"🔍 Analyzing content for agent relevance...")
+        yield from self._iter_chunks(raw_content, source, agent_profile, STREAM_BATCH_SIZE)
+    
+    def extract_many(self, sources: List[str], agent_profile: Optional[AgentProfile] = None,
+                     max_parallel: Optional[int] = None, **kwargs) -> List[ExtractionResult]:
+        """Extract several repositories concurrently (cloning is network-bound)"""
+        max_parallel = max_parallel or self.max_parallel
+        results: List[Optional[ExtractionResult]] = [None] * len(sources)
+        
+        # Each extract() call clones into its own temporary directory
+        with ThreadPoolExecutor(max_workers=max(1, min(max_parallel, len(sources)))) as executor:
+            futures = {
+                executor.submit(self.extract, source, agent_profile, **kwargs): index
+                for index, source in enumerate(sources)
+            }
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        
+        return results
+    
+    @contextmanager
+    def _repository_dir(self, source: str) -> Iterator[Path]:
+        """Directory to hold the repository checkout for the duration of the block"""
+        if self.cache_dir is None:
+            with tempfile.TemporaryDirectory() as temp_dir:
+                yield Path(temp_dir) / "repository"
+            return
+        
+        cache_path = self.cache_dir / hashlib.sha1(source.encode()).hexdigest()
+        
+        # One extraction at a time per cached checkout (extract_many runs in threads)
+        with self._cache_locks_guard:
+            lock = self._cache_locks.setdefault(cache_path, threading.Lock())
+        with lock:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+            yield cache_path
+    
+    def _fetch_repository(self, repo_url: str, repo_path: Path):
+        """Update an existing cached clone, or clone the repository"""
+        fetched_marker = repo_path / ".git" / FETCHED_MARKER
+        if (repo_path / ".git").exists():
+            if self._is_fresh(fetched_marker):
+                print(f"♻️  Using cached repository: {repo_url}")
+                return
+            
+            print(f"🔄 Updating cached repository: {repo_url}")
+            try:
+                self._update_repository(repo_path)
+                fetched_marker.touch()
+                return
+            except (RuntimeError, subprocess.TimeoutExpired) as e:
+                print(f"⚠️  Cached clone update failed, re-cloning: {e}")
+                shutil.rmtree(repo_path, ignore_errors=True)
+        
+        print(f"📥 Cloning repository: {repo_url}")
+        try:
+            self._clone_repository(repo_url, repo_path)
+            fetched_marker.touch()
+        except Exception:
+            shutil.rmtree(repo_path, ignore_errors=True)  # never leave a partial clone cached
+            raise
+    
+    def _is_fresh(self, fetched_marker: Path) -> bool:
+        """Whether the cached clone was refreshed within cache_max_age seconds"""
+        if self.cache_max_age <= 0:
+            return False
+        try:
+            return time.time() - fetched_marker.stat().st_mtime < self.cache_max_age
+        except FileNotFoundError:
+            return False
+    
+    def _update_repository(self, repo_path: Path):
+        """Fast-forward a cached shallow clone to the remote HEAD"""
+        fetch = ["git", "-C", str(repo_path), "fetch", "--quiet", "--depth", str(self.clone_depth), "--no-tags"]
+        if self.partial_clone:
+            fetch.append("--filter=blob:none")
+        fetch += ["origin", "HEAD"]
+        
+        for cmd in (fetch, ["git", "-C", str(repo_path), "reset", "--quiet", "--hard", "FETCH_HEAD"]):
+            result = self._run_git(cmd)
+            if result.returncode != 0:
+                raise RuntimeError(f"Git update failed: {result.stderr}")
+    
     def _clone_repository(self, repo_url: str, target_path: Path):
-        """Clone GitHub repository"""
-        cmd = [
-            "git", "clone",
-            repo_url,
-            str(target_path),
-            "--depth", str(self.clone_depth)
-        ]
+        """Clone GitHub repository (shallow, single branch, blobs fetched lazily)"""
+        result = self._run_clone(repo_url, target_path, self.partial_clone)
         
+        # Retry without --filter if the server rejects partial clone
+        if result.returncode != 0 and self.partial_clone and "filter" in result.stderr:
+            shutil.rmtree(target_path, ignore_errors=True)
+            result = self._run_clone(repo_url, target_path, partial=False)
+        
+        if result.returncode != 0:
+            raise RuntimeError(f"Git clone failed: {result.stderr}")
+    
+    def _run_git(self, cmd: List[str]) -> subprocess.CompletedProcess:
+        """Run a git command, discarding stdout; stderr is decoded only on failure"""
         result = subprocess.run(
-            cmd, 
-            capture_output=True, 
-            text=True, 
+            cmd,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.PIPE,
             timeout=self.timeout
         )
+        result.stderr = result.stderr.decode(errors='replace') if result.returncode != 0 else ''
+        return result
+    
+    def _run_clone(self, repo_url: str, target_path: Path, partial: bool) -> subprocess.CompletedProcess:
+        """Run git clone, retrying with exponential backoff when it times out"""
+        cmd = [
+            "git", "-c", "protocol.version=2", "clone", "--quiet",
+            "--depth", str(self.clone_depth),
+            "--single-branch",
+            "--no-tags"
+        ]
+        if partial:
+            cmd.append("--filter=blob:none")
+        cmd += [repo_url, str(target_path)]
         
-        if result.returncode != 0:
-            raise RuntimeError(f"Git clone failed: {result.stderr}")
+        for attempt in range(self.clone_retries):
+            try:
+                return self._run_git(cmd)
+            except subprocess.TimeoutExpired:
+                shutil.rmtree(target_path, ignore_errors=True)  # drop the partial clone
+                if attempt == self.clone_retries - 1:
+                    raise
+                print(f"⏱️  Clone timed out after {self.timeout}s, retrying ({attempt + 2}/{self.clone_retries})...")
+                time.sleep(2 ** attempt)
     
     def _extract_with_gpt_loader(self, repo_path: Path, agent_profile: Optional[AgentProfile]) -> str:
         """Extract repository content using gpt-repository-loader"""
@@ -129,26 +280,28 @@ class GitHubExtractor(BaseExtractor):
     def _parse_content_to_chunks(self, raw_content: str, source: str, 
                                 agent_profile: Optional[AgentProfile]) -> List[KnowledgeChunk]:
         """Parse raw content into knowledge chunks with agent-specific filtering"""
-        chunks = []
+        chunks = list(self._iter_chunks(raw_content, source, agent_profile))
         
-        # Split content by file separators (gpt-repository-loader format)
-        file_sections = raw_content.split('----\n')
+        # Sort by relevance score (highest first)
+        chunks.sort(key=lambda x: x.relevance_score, reverse=True)
         
-        for section in file_sections[1:]:  # Skip first empty section
-            if not section.strip() or section.startswith('--END--'):
-                continue
-            
-            lines = section.split('\n')
-            if len(lines) < 2:
-                continue
-            
-            file_path = lines[0].strip()
-            file_content = '\n'.join(lines[1:])
-            
-            # Skip if file doesn't match agent's patterns
-            if agent_profile and not self._matches_agent_patterns(file_path, agent_profile):
-                continue
-            
+        return chunks
+    
+    def _iter_chunks(self, raw_content: str, source: str, agent_profile: Optional[AgentProfile],
+                     batch_size: Optional[int] = None) -> Iterator[KnowledgeChunk]:
+        """Yield relevant knowledge chunks in file order, counting tokens batch_size files at a time"""
+        selected = []  # (file_path, file_content, relevance_score)
+        
+        # Compile the agent's include/exclude globs once for the whole dump;
+        # files that don't match the agent's patterns are skipped by path alone
+        matches_patterns = None
+        if agent_profile:
+            matches_patterns = self.pattern_filter(
+                agent_profile.file_patterns,
+                agent_profile.exclude_patterns
+            )
+        
+        for file_path, file_content in self._iter_file_sections(raw_content, matches_patterns):
             # Calculate relevance score
             relevance_score = 1.0
             if agent_profile:
@@ -161,13 +314,25 @@ class GitHubExtractor(BaseExtractor):
             if relevance_score < 0.1:
                 continue
             
-            # Create knowledge chunk
-            chunk = KnowledgeChunk(
+            selected.append((file_path, file_content, relevance_score))
+            if batch_size and len(selected) >= batch_size:
+                yield from self._build_chunks(selected, source)
+                selected = []
+        
+        yield from self._build_chunks(selected, source)
+    
+    def _build_chunks(self, selected: List[Tuple[str, str, float]], source: str) -> List[KnowledgeChunk]:
+        """Create knowledge chunks for (file_path, file_content, relevance_score) entries"""
+        # Count tokens for all selected files in one batch
+        token_counts = self.count_tokens_batch([file_content for _, file_content, _ in selected])
+        
+        return [
+            KnowledgeChunk(
                 content=file_content,
                 source_path=file_path,
                 file_type=Path(file_path).suffix,
                 language=self.detect_language(file_path),
-                size_tokens=self.count_tokens(file_content),
+                size_tokens=size_tokens,
                 relevance_score=relevance_score,
                 metadata={
                     "source_repository": source,
@@ -175,13 +340,44 @@ class GitHubExtractor(BaseExtractor):
                     "extraction_method": "gpt_repository_loader"
                 }
             )
-            
-            chunks.append(chunk)
+            for (file_path, file_content, relevance_score), size_tokens in zip(selected, token_counts)
+        ]
+    
+    @staticmethod
+    def _iter_file_sections(raw_content: str,
+                            path_filter: Optional[Callable[[str], bool]] = None) -> Iterator[Tuple[str, str]]:
+        """Yield (file_path, file_content) for each '----' section in one forward scan
         
-        # Sort by relevance score (highest first)
-        chunks.sort(key=lambda x: x.relevance_score, reverse=True)
+        Sections whose path fails path_filter are skipped before their content is sliced.
+        """
+        separator = '----\n'
+        start = raw_content.find(separator)  # text before the first separator is skipped
         
-        return chunks
+        while start != -1:
+            start += len(separator)
+            next_start = raw_content.find(separator, start)
+            end = len(raw_content) if next_start == -1 else next_start
+            newline = raw_content.find('\n', start, end)
+            
+            # Sections need a path line; skip the --END-- marker and blank sections
+            if newline != -1 and not raw_content.startswith('--END--', start):
+                file_path = raw_content[start:newline].strip()
+                if path_filter is None or path_filter(file_path):
+                    file_content = raw_content[newline + 1:end]
+                    if file_path or file_content.strip():
+                        yield file_path, file_content
+            
+            start = next_start
+    
+    @classmethod
+    def _iter_file_names(cls, directory: Path) -> Iterator[str]:
+        """Yield the names of all files below directory (d_type from readdir, no stat per entry)"""
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    yield from cls._iter_file_names(entry.path)
+                elif entry.is_file():
+                    yield entry.name
     
     def _matches_agent_patterns(self, file_path: str, agent_profile: AgentProfile) -> bool:
         """Check if file matches agent's file patterns"""
@@ -193,35 +389,23 @@ class GitHubExtractor(BaseExtractor):
     
     def extract_repository_info(self, source: str) -> Dict[str, Any]:
         """Extract basic repository information without full content"""
-        with tempfile.TemporaryDirectory() as temp_dir:
-            repo_path = Path(temp_dir) / "repository"
-            
+        with self._repository_dir(source) as repo_path:
             try:
-                self._clone_repository(source, repo_path)
-                
-                # Get repository structure
-                structure_output = []
-                gpt_repository_loader.print_directory_structure(
-                    str(repo_path), 
-                    max_depth=3
-                )
+                self._fetch_repository(source, repo_path)
                 
                 # Get file counts by type
-                file_counts = {}
-                for file_path in repo_path.rglob("*"):
-                    if file_path.is_file():
-                        suffix = file_path.suffix.lower()
-                        file_counts[suffix] = file_counts.get(suffix, 0) + 1
+                file_counts = dict(Counter(
+                    _suffix(name) for name in self._iter_file_names(repo_path)
+                ))
                 
                 return {
                     "repository_url": source,
                     "file_counts": file_counts,
                     "total_files": sum(file_counts.values()),
-                    "languages": list(set(
-                        self.detect_language(f".{ext}") 
-                        for ext in file_counts.keys() 
-                        if self.detect_language(f".{ext}")
-                    ))
+                    "languages": list({
+                        language for ext in file_counts
+                        if (language := self.detect_language(f".{ext}"))
+                    })
                 }
                 
             except Exception as e:
@@ -4,20 +4,115 @@ BigAcademy Dataset Generator
 Generate training datasets from knowledge graph using Distilabel
 """
 
-import json
 import uuid
 from pathlib import Path
-from typing import Dict, List, Any, Optional, Iterator
-from dataclasses import dataclass, asdict
+from typing import Dict, List, Any, Optional, Iterator, Iterable, Tuple
+from dataclasses import dataclass
 from datetime import datetime
+from functools import lru_cache
 import random
 
 from ..core.agent_profiles import AgentProfile
-from ..core.graph_db import GraphDB
+from ..core.graph_db import GraphDB, GraphNode
 from ..extractors.base_extractor import KnowledgeChunk
 from .prompt_templates import PromptTemplateManager
+from ..utils import jsonl_line, json_indented
 
-@dataclass
+# Placeholder responses by template type, filled with str.format
+_PLACEHOLDER_TEMPLATES = {
+    'question_answer': """**Question:** How would you implement this functionality as an Expert {title}?
+
+**Answer:** As an Expert {title}, I would approach this implementation by focusing on {focus_areas}. The solution should leverage {technologies_3} technologies to ensure scalability and maintainability.
+
+[This is a placeholder response - in production, this would be generated by an LLM using the full prompt]""",
+    
+    'code_review': """**Code Review Summary:**
+
+**Overall Assessment:** This code demonstrates solid understanding of {language} fundamentals.
+
+**Strengths:**
+- Clean structure and readable implementation
+- Appropriate use of {language} patterns
+
+**Areas for Improvement:**
+- Consider adding error handling
+- Add comprehensive documentation
+- Implement proper testing coverage
+
+**Recommended Changes:**
+[Specific code improvements would be provided here]
+
+**Additional Recommendations:**
+Based on my expertise in {focus_areas}, I recommend implementing proper logging and monitoring.
+
+Review conducted by: Expert {title}""",
+    
+    'implementation_task': """**Implementation Task:**
+
+**Scenario:** [Realistic scenario based on the knowledge context]
+
+**Requirements:**
+- Implement using {technologies_2}
+- Follow {focus_areas} best practices
+
+**Implementation:**
+[Complete solution would be provided here]
+
+**Architecture Decisions:** [Professional design choices explained]
+
+Implemented by: Expert {title}""",
+    
+    'debugging_scenario': """**Debugging Scenario:**
+
+**Problem Description:** [Issue description based on code]
+
+**Debugging Process:**
+1. **Problem Analysis:** Applied systematic debugging approach
+2. **Root Cause:** Identified the core issue
+3. **Solution:** Implemented proper fix
+4. **Prevention:** Recommended best practices
+
+Debugged by: Expert {title}""",
+    
+    'multi_turn_conversation': """**Multi-Turn Conversation:**
+
+**Turn 1:**
+*Client:* [Initial request]
+*Expert {title}:* [Professional guidance]
+
+**Turn 2:**
+*Client:* [Follow-up question]
+*Expert {title}:* [Detailed technical response]
+
+[Additional turns would continue here]
+
+**Conversation Summary:**
+Technologies Discussed: {technologies_3}
+Key Insights: Professional expertise demonstrated throughout"""
+}
+
+def _write_jsonl(file_path: Path, objects: Iterable[Any]):
+    """Stream objects to a JSONL file through a 1 MiB write buffer"""
+    with open(file_path, 'wb', buffering=1 << 20) as f:
+        f.writelines(jsonl_line(obj) for obj in objects)
+
+@lru_cache(maxsize=128)
+def _placeholder_response(template_type: str, title: str, focus_areas: Tuple[str, ...],
+                          technologies: Tuple[str, ...], language: Optional[str]) -> str:
+    """Render (once per distinct input) the placeholder response for a template type"""
+    template = _PLACEHOLDER_TEMPLATES.get(template_type)
+    if template is None:
+        return f"Professional response from Expert {title}"
+    
+    return template.format(
+        title=title,
+        focus_areas=', '.join(focus_areas[:2]),
+        technologies_2=', '.join(technologies[:2]),
+        technologies_3=', '.join(technologies[:3]),
+        language=language
+    )
+
+@dataclass(slots=True)
 class DatasetSample:
     """Single training sample for agent dataset"""
     id: str
@@ -28,7 +123,7 @@ class DatasetSample:
     metadata: Dict[str, Any]
     created_at: str
 
-@dataclass
+@dataclass(slots=True)
 class DatasetBatch:
     """Batch of dataset samples"""
     agent_name: str
@@ -125,22 +220,20 @@ class DatasetGenerator:
         
         agent_node = agents[0]
         
-        # Get all knowledge relationships
-        learn_relationships = self.graph_db.get_relationships(
-            agent_node.id, "LEARNS_FROM", "outgoing"
-        )
+        # Chunks above the threshold, highest relevance first (filtered and sorted in SQL)
+        chunk_nodes = self.graph_db.get_agent_chunk_nodes(agent_node.id, min_relevance_score)
+        
+        # Fetch their CONTAINS edges and sources in a few batched queries
+        chunk_ids = [chunk_node.id for chunk_node in chunk_nodes]
+        contains_by_chunk = self.graph_db.get_relationships_bulk(chunk_ids, "CONTAINS", "incoming")
+        source_nodes = self.graph_db.get_nodes([
+            rel.source_id for rels in contains_by_chunk.values() for rel in rels
+        ])
         
         knowledge_chunks = []
         
-        for rel in learn_relationships:
-            chunk_node = self.graph_db.get_node(rel.target_id)
-            if not chunk_node:
-                continue
-            
-            # Check relevance score
+        for chunk_node in chunk_nodes:
             relevance = chunk_node.properties.get('relevance_score', 0)
-            if relevance < min_relevance_score:
-                continue
             
             # Create knowledge chunk data
             chunk_data = {
@@ -153,14 +246,14 @@ class DatasetGenerator:
                     relevance_score=relevance,
                     metadata=chunk_node.properties.get('metadata', {})
                 ),
-                'source_info': self._get_source_info_for_chunk(rel.target_id)
+                'source_info': self._source_info(
+                    source_nodes.get(contains.source_id)
+                    for contains in contains_by_chunk[chunk_node.id]
+                )
             }
             
             knowledge_chunks.append(chunk_data)
         
-        # Sort by relevance score (highest first)
-        knowledge_chunks.sort(key=lambda x: x['chunk'].relevance_score, reverse=True)
-        
         return knowledge_chunks
     
     def _get_source_info_for_chunk(self, chunk_id: str) -> Dict[str, Any]:
@@ -168,9 +261,11 @@ class DatasetGenerator:
         
         # Find source that contains this chunk
         contains_rels = self.graph_db.get_relationships(chunk_id, "CONTAINS", "incoming")
-        
-        for rel in contains_rels:
-            source_node = self.graph_db.get_node(rel.source_id)
+        return self._source_info(self.graph_db.get_node(rel.source_id) for rel in contains_rels)
+    
+    def _source_info(self, source_nodes: Iterable[Optional[GraphNode]]) -> Dict[str, Any]:
+        """Source information from the first Source node among candidates"""
+        for source_node in source_nodes:
             if source_node and source_node.node_type == "Source":
                 return {
                     'url': source_node.properties.get('url', 'unknown'),
@@ -189,27 +284,57 @@ class DatasetGenerator:
                                randomize_order: bool) -> Optional[DatasetBatch]:
         """Generate a batch of samples using a specific template"""
         
-        if randomize_order:
-            knowledge_chunks = knowledge_chunks.copy()
-            random.shuffle(knowledge_chunks)
-        
-        samples = []
+        batch_now = datetime.now().isoformat()  # one timestamp for the whole batch
+        scores = [chunk['chunk'].relevance_score for chunk in knowledge_chunks]
         generation_config = {
             'template_type': template_type,
             'max_samples': max_samples,
             'agent_name': agent_profile.name,
-            'min_relevance_score': min([chunk['chunk'].relevance_score for chunk in knowledge_chunks]) if knowledge_chunks else 0,
-            'max_relevance_score': max([chunk['chunk'].relevance_score for chunk in knowledge_chunks]) if knowledge_chunks else 0
+            'min_relevance_score': min(scores) if scores else 0,
+            'max_relevance_score': max(scores) if scores else 0
         }
         
+        # Pick up to max_samples chunks; random.sample only shuffles the picked prefix
+        selected_chunks = knowledge_chunks[:max_samples]
+        if randomize_order:
+            selected_chunks = random.sample(knowledge_chunks, len(selected_chunks))
+        
         # Generate samples up to max_samples
-        for i, chunk_data in enumerate(knowledge_chunks[:max_samples]):
+        samples = self._generate_sample_batch(
+            agent_profile, template_type, selected_chunks, now=batch_now
+        )
+        
+        if not samples:
+            return None
+        
+        return DatasetBatch(
+            agent_name=agent_profile.name,
+            template_type=template_type,
+            samples=samples,
+            total_samples=len(samples),
+            generation_config=generation_config,
+            created_at=batch_now
+        )
+    
+    def _generate_sample_batch(self,
+                              agent_profile: AgentProfile,
+                              template_type: str,
+                              chunks: List[Dict[str, Any]],
+                              start_index: int = 0,
+                              now: Optional[str] = None) -> List[DatasetSample]:
+        """Generate one sample per chunk with the same template, skipping failures"""
+        
+        now = now or datetime.now().isoformat()
+        samples = []
+        
+        for i, chunk_data in enumerate(chunks):
             try:
                 sample = self._generate_single_sample(
                     agent_profile=agent_profile,
                     template_type=template_type,
                     chunk_data=chunk_data,
-                    sample_index=i
+                    sample_index=start_index + i,
+                    now=now
                 )
                 
                 if sample:
@@ -217,32 +342,24 @@ class DatasetGenerator:
                     
                     # Progress indicator
                     if (i + 1) % 10 == 0:
-                        print(f"      Generated {i + 1}/{min(max_samples, len(knowledge_chunks))} samples")
+                        print(f"      Generated {i + 1}/{len(chunks)} samples")
                 
             except Exception as e:
                 print(f"      ❌ Error generating sample {i+1}: {e}")
                 self.generation_stats['failed_generations'] += 1
                 continue
         
-        if not samples:
-            return None
-        
-        return DatasetBatch(
-            agent_name=agent_profile.name,
-            template_type=template_type,
-            samples=samples,
-            total_samples=len(samples),
-            generation_config=generation_config,
-            created_at=datetime.now().isoformat()
-        )
+        return samples
     
     def _generate_single_sample(self,
                               agent_profile: AgentProfile,
                               template_type: str,
                               chunk_data: Dict[str, Any],
-                              sample_index: int) -> Optional[DatasetSample]:
+                              sample_index: int,
+                              now: Optional[str] = None) -> Optional[DatasetSample]:
         """Generate a single training sample"""
         
+        now = now or datetime.now().isoformat()
         chunk = chunk_data['chunk']
         source_info = chunk_data['source_info']
         
@@ -274,17 +391,17 @@ class DatasetGenerator:
             'agent_role': agent_profile.role.title,
             'agent_technologies': agent_profile.technologies,
             'agent_focus_areas': agent_profile.focus_areas,
-            'generation_timestamp': datetime.now().isoformat()
+            'generation_timestamp': now
         }
         
         return DatasetSample(
-            id=str(uuid.uuid4()),
+            id=uuid.uuid4().hex,
             agent_name=agent_profile.name,
             template_type=template_type,
             prompt=prompt,
             expected_response=expected_response,
             metadata=metadata,
-            created_at=datetime.now().isoformat()
+            created_at=now
         )
     
     def _generate_placeholder_response(self,
@@ -293,79 +410,13 @@ class DatasetGenerator:
                                      chunk: KnowledgeChunk) -> str:
         """Generate placeholder response for testing (replace with LLM call)"""
         
-        responses = {
-            'question_answer': f"""**Question:** How would you implement this functionality as an Expert {agent_profile.role.title}?
-
-**Answer:** As an Expert {agent_profile.role.title}, I would approach this implementation by focusing on {', '.join(agent_profile.focus_areas[:2])}. The solution should leverage {', '.join(agent_profile.technologies[:3])} technologies to ensure scalability and maintainability.
-
-[This is a placeholder response - in production, this would be generated by an LLM using the full prompt]""",
-            
-            'code_review': f"""**Code Review Summary:**
-
-**Overall Assessment:** This code demonstrates solid understanding of {chunk.language} fundamentals.
-
-**Strengths:**
-- Clean structure and readable implementation
-- Appropriate use of {chunk.language} patterns
-
-**Areas for Improvement:**
-- Consider adding error handling
-- Add comprehensive documentation
-- Implement proper testing coverage
-
-**Recommended Changes:**
-[Specific code improvements would be provided here]
-
-**Additional Recommendations:**
-Based on my expertise in {', '.join(agent_profile.focus_areas[:2])}, I recommend implementing proper logging and monitoring.
-
-Review conducted by: Expert {agent_profile.role.title}""",
-            
-            'implementation_task': f"""**Implementation Task:**
-
-**Scenario:** [Realistic scenario based on the knowledge context]
-
-**Requirements:**
-- Implement using {', '.join(agent_profile.technologies[:2])}
-- Follow {', '.join(agent_profile.focus_areas[:2])} best practices
-
-**Implementation:**
-[Complete solution would be provided here]
-
-**Architecture Decisions:** [Professional design choices explained]
-
-Implemented by: Expert {agent_profile.role.title}""",
-            
-            'debugging_scenario': f"""**Debugging Scenario:**
-
-**Problem Description:** [Issue description based on code]
-
-**Debugging Process:**
-1. **Problem Analysis:** Applied systematic debugging approach
-2. **Root Cause:** Identified the core issue
-3. **Solution:** Implemented proper fix
-4. **Prevention:** Recommended best practices
-
-Debugged by: Expert {agent_profile.role.title}""",
-            
-            'multi_turn_conversation': f"""**Multi-Turn Conversation:**
-
-**Turn 1:**
-*Client:* [Initial request]
-*Expert {agent_profile.role.title}:* [Professional guidance]
-
-**Turn 2:**
-*Client:* [Follow-up question]
-*Expert {agent_profile.role.title}:* [Detailed technical response]
-
-[Additional turns would continue here]
-
-**Conversation Summary:**
-Technologies Discussed: {', '.join(agent_profile.technologies[:3])}
-Key Insights: Professional expertise demonstrated throughout"""
-        }
-        
-        return responses.get(template_type, f"Professional response from Expert {agent_profile.role.title}")
+        return _placeholder_response(
+            template_type,
+            agent_profile.role.title,
+            tuple(agent_profile.focus_areas[:2]),
+            tuple(agent_profile.technologies[:3]),
+            chunk.language
+        )
     
     def save_dataset_batches(self, 
                            dataset_batches: List[DatasetBatch],
@@ -394,16 +445,12 @@ Key Insights: Professional expertise demonstrated throughout"""
     
     def _save_as_jsonl(self, batch: DatasetBatch, file_path: Path):
         """Save batch as JSONL format (one JSON object per line)"""
-        with open(file_path, 'w', encoding='utf-8') as f:
-            for sample in batch.samples:
-                json.dump(asdict(sample), f, ensure_ascii=False)
-                f.write('\n')
+        _write_jsonl(file_path, batch.samples)
     
     def _save_as_json(self, batch: DatasetBatch, file_path: Path):
         """Save batch as JSON format"""
-        batch_data = asdict(batch)
-        with open(file_path, 'w', encoding='utf-8') as f:
-            json.dump(batch_data, f, indent=2, ensure_ascii=False)
+        with open(file_path, 'wb') as f:
+            f.write(json_indented(batch))
     
     def get_generation_stats(self) -> Dict[str, Any]:
         """Get dataset generation statistics"""
@@ -418,31 +465,27 @@ Key Insights: Professional expertise demonstrated throughout"""
             timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
             output_file = self.output_dir / f"distilabel_dataset_{timestamp}.jsonl"
         
-        distilabel_samples = []
-        
-        for batch in dataset_batches:
-            for sample in batch.samples:
-                # Convert to Distilabel format
-                distilabel_sample = {
-                    "instruction": sample.prompt,
-                    "output": sample.expected_response,
-                    "input": "",  # Empty for instruction-following format
-                    "metadata": {
-                        "agent_name": sample.agent_name,
-                        "template_type": sample.template_type,
-                        "sample_id": sample.id,
-                        **sample.metadata
-                    }
+        distilabel_samples = (
+            # Convert to Distilabel format (fields read directly, no asdict copy)
+            {
+                "instruction": sample.prompt,
+                "output": sample.expected_response,
+                "input": "",  # Empty for instruction-following format
+                "metadata": {
+                    "agent_name": sample.agent_name,
+                    "template_type": sample.template_type,
+                    "sample_id": sample.id,
+                    **sample.metadata
                 }
-                distilabel_samples.append(distilabel_sample)
+            }
+            for batch in dataset_batches
+            for sample in batch.samples
+        )
         
-        # Save in Distilabel format
-        with open(output_file, 'w', encoding='utf-8') as f:
-            for sample in distilabel_samples:
-                json.dump(sample, f, ensure_ascii=False)
-                f.write('\n')
+        # Save in Distilabel format (streamed, one sample encoded at a time)
+        _write_jsonl(Path(output_file), distilabel_samples)
         
         print(f"🎯 Created Distilabel dataset: {output_file}")
-        print(f"   Total samples: {len(distilabel_samples)}")
+        print(f"   Total samples: {sum(len(batch.samples) for batch in dataset_batches)}")
         
         return output_file
\ No newline at end of file
@@ -4,12 +4,22 @@ BigAcademy Generic Prompt Template Manager
 Fully config-based template system with no hardcoded agent types
 """
 
+import hashlib
+import json
+import os
+import tempfile
 import yaml
 from pathlib import Path
-from typing import Dict, List, Any, Optional
-from dataclasses import dataclass
+from typing import Dict, List, Any, Optional, Tuple
+from dataclasses import asdict, dataclass
+from functools import cached_property, lru_cache
 import re
 
+try:
+    from yaml import CSafeLoader as _Loader
+except ImportError:  # libyaml not available
+    from yaml import SafeLoader as _Loader
+
 @dataclass
 class TemplateConfig:
     """Configuration for a prompt template"""
@@ -24,10 +34,23 @@ class TemplateConfig:
 class PromptTemplateManager:
     """Generic prompt template manager that works with any agent configuration"""
     
+    # {variable} placeholders in template text
+    _VAR_RE = re.compile(r'\{([^}]+)\}')
+    
+    # Rendered sections kept per manager; sections using chunk.* variables are never cached
+    _RENDER_CACHE_SIZE = 256
+    
+    # Parsed templates persisted across runs as JSON (one file per templates
+    # directory, outside the source tree), invalidated per file by (mtime_ns, size)
+    CACHE_DIR = Path("~/.cache/bigacademy/templates").expanduser()
+    CACHE_VERSION = 2
+    
     def __init__(self, templates_dir: Path):
         self.templates_dir = templates_dir
         self.templates: Dict[str, TemplateConfig] = {}
-        self.template_types_config = {}
+        self._types_raw: Optional[bytes] = None  # template_types.yaml, parsed on first use
+        self._agent_vars_cache: Dict[str, Tuple[Any, Dict[str, Any]]] = {}  # name -> (profile, vars)
+        self._render_cache: Dict[Tuple[str, Tuple[str, ...]], str] = {}
         self._load_all_templates()
     
     def _load_all_templates(self):
@@ -35,8 +58,10 @@ class PromptTemplateManager:
         # Load template types configuration
         types_file = self.templates_dir / "template_types.yaml"
         if types_file.exists():
-            with open(types_file, 'r', encoding='utf-8') as f:
-                self.template_types_config = yaml.safe_load(f)
+            self._types_raw = types_file.read_bytes()
+        
+        cached = self._read_template_cache()
+        fresh = {}
         
         # Load individual template files
         for template_file in self.templates_dir.glob("*.yaml"):
@@ -44,24 +69,83 @@ class PromptTemplateManager:
                 continue
                 
             try:
-                with open(template_file, 'r', encoding='utf-8') as f:
-                    template_data = yaml.safe_load(f)
+                stat = os.stat(template_file)
+                stat_key = (stat.st_mtime_ns, stat.st_size)
                 
-                template_config = TemplateConfig(
-                    template_type=template_data['template_type'],
-                    description=template_data['description'],
-                    system_prompt=template_data['system_prompt'],
-                    knowledge_context=template_data['knowledge_context'],
-                    task_instruction=template_data['task_instruction'],
-                    response_format=template_data['response_format'],
-                    variables=template_data.get('variables', [])
-                )
+                entry = cached.get(template_file.name)
+                if entry is not None and entry[0] == stat_key:
+                    template_config = entry[1]
+                else:
+                    with open(template_file, 'rb') as f:
+                        template_data = yaml.load(f, Loader=_Loader)
+                    
+                    template_config = TemplateConfig(
+                        template_type=template_data['template_type'],
+                        description=template_data['description'],
+                        system_prompt=template_data['system_prompt'],
+                        knowledge_context=template_data['knowledge_context'],
+                        task_instruction=template_data['task_instruction'],
+                        response_format=template_data['response_format'],
+                        variables=template_data.get('variables', [])
+                    )
                 
+                fresh[template_file.name] = (stat_key, template_config)
                 self.templates[template_config.template_type] = template_config
                 print(f"✅ Loaded template: {template_config.template_type}")
                 
             except Exception as e:
                 print(f"❌ Error loading template {template_file}: {e}")
+        
+        if fresh != cached:
+            self._write_template_cache(fresh)
+    
+    @cached_property
+    def _cache_file(self) -> Path:
+        """Cache file for this templates directory"""
+        key = hashlib.sha1(str(self.templates_dir.resolve()).encode()).hexdigest()
+        return self.CACHE_DIR / f"{key}.json"
+    
+    def _read_template_cache(self) -> Dict[str, Tuple[Tuple[int, int], TemplateConfig]]:
+        """Load previously parsed templates (empty on any mismatch or error)"""
+        try:
+            with open(self._cache_file, 'rb') as f:
+                data = json.load(f)
+            if data['version'] != self.CACHE_VERSION:
+                return {}
+            return {
+                name: (tuple(stat_key), TemplateConfig(**config))
+                for name, (stat_key, config) in data['entries'].items()
+            }
+        except Exception:
+            return {}
+    
+    def _write_template_cache(self, entries: Dict[str, Tuple[Tuple[int, int], TemplateConfig]]):
+        """Persist parsed templates for the next run (best effort, atomic replace)"""
+        data = {
+            'version': self.CACHE_VERSION,
+            'entries': {name: (stat_key, asdict(config)) for name, (stat_key, config) in entries.items()},
+        }
+        tmp_path = None
+        try:
+            self.CACHE_DIR.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(dir=self.CACHE_DIR, suffix='.tmp')
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            # Concurrent writers each replace the whole file; readers never see a partial one
+            os.replace(tmp_path, self._cache_file)
+        except OSError:
+            if tmp_path is not None:
+                try:
+                    os.unlink(tmp_path)
+                except OSError:
+                    pass
+    
+    @cached_property
+    def template_types_config(self) -> Dict[str, Any]:
+        """Template types configuration, parsed lazily on first access"""
+        if self._types_raw is None:
+            return {}
+        return yaml.load(self._types_raw, Loader=_Loader)  # libyaml decodes UTF-8 itself
     
     def get_available_templates(self) -> List[str]:
         """Get list of available template types"""
@@ -71,32 +155,30 @@ class PromptTemplateManager:
         """Get templates suitable for a specific agent and content type"""
         suitable = []
         
+        # Agent's role and focus areas, lowercased once for all templates and
+        # joined on NUL so one substring check can't match across two entries
+        agent_text = '\0'.join([agent_profile.role.title, *agent_profile.focus_areas]).lower()
+        
         for template_type, template_config in self.template_types_config.get('template_types', {}).items():
             # Check if template exists
             if template_type not in self.templates:
                 continue
             
-            # Check if suitable for agent (generic approach)
+            # Suitable for the agent (generic approach: all agents, or a pattern
+            # in the agent's role/focus areas) or for the content type
             suitable_for = template_config.get('suitable_for', ['all_agents'])
-            if 'all_agents' in suitable_for:
-                suitable.append(template_type)
-                continue
-            
-            # Check against agent's role and focus areas
-            agent_role = agent_profile.role.title.lower()
-            agent_focus = [area.lower() for area in agent_profile.focus_areas]
-            
-            for role_pattern in suitable_for:
-                if (role_pattern in agent_role or 
-                    any(role_pattern in focus for focus in agent_focus)):
-                    suitable.append(template_type)
-                    break
-            
-            # Check content type compatibility
             content_types = template_config.get('content_types', ['all'])
-            if content_type in content_types or 'all' in content_types:
-                if template_type not in suitable:
-                    suitable.append(template_type)
+            eligible = (
+                'all_agents' in suitable_for
+                or any(role_pattern in agent_text and '\0' not in role_pattern
+                       for role_pattern in suitable_for)
+                or content_type in content_types
+                or 'all' in content_types
+            )
+            
+            # Template types are unique keys, so each is appended at most once
+            if eligible:
+                suitable.append(template_type)
         
         return suitable
     
@@ -143,20 +225,8 @@ class PromptTemplateManager:
                                   source_info: Dict[str, Any], **kwargs) -> Dict[str, Any]:
         """Prepare all variables needed for template filling"""
         
-        # Agent profile variables
-        role_vars = {
-            'role.title': agent_profile.role.title,
-            'role.description': agent_profile.role.description,
-            'role.domain_expertise': ', '.join(agent_profile.role.domain_expertise),
-            'role.communication_style': agent_profile.role.communication_style,
-            'role.identity_prompt': agent_profile.role.identity_prompt
-        }
-        
-        # Agent specific variables
-        agent_vars = {
-            'technologies': ', '.join(agent_profile.technologies),
-            'focus_areas': ', '.join(agent_profile.focus_areas)
-        }
+        # Agent-level variables are invariant per profile
+        agent_vars = self._agent_vars(agent_profile)
         
         # Knowledge chunk variables
         chunk_vars = {
@@ -179,7 +249,6 @@ class PromptTemplateManager:
         
         # Combine all variables
         template_vars = {
-            **role_vars,
             **agent_vars,
             **chunk_vars,
             **source_vars,
@@ -189,18 +258,66 @@ class PromptTemplateManager:
         
         return template_vars
     
+    def _agent_vars(self, agent_profile) -> Dict[str, Any]:
+        """Role and agent variables, joined once per (immutable) profile"""
+        cached = self._agent_vars_cache.get(agent_profile.name)
+        if cached is not None and cached[0] is agent_profile:
+            return cached[1]
+        
+        role = agent_profile.role
+        agent_vars = {
+            'role.title': role.title,
+            'role.description': role.description,
+            'role.domain_expertise': ', '.join(role.domain_expertise),
+            'role.communication_style': role.communication_style,
+            'role.identity_prompt': role.identity_prompt,
+            'technologies': ', '.join(agent_profile.technologies),
+            'focus_areas': ', '.join(agent_profile.focus_areas)
+        }
+        self._agent_vars_cache[agent_profile.name] = (agent_profile, agent_vars)
+        return agent_vars
+    
     def _fill_template(self, template_text: str, variables: Dict[str, Any]) -> str:
         """Fill template with variables using safe string formatting"""
+        format_string, var_names, per_sample = self._compile_template(template_text)
+        variables_get = variables.get
+        
+        # Unfound variables are kept as-is; fields have no format spec, so str() renders identically
+        values = tuple(str(variables_get(var_name, f"{{{var_name}}}")) for var_name in var_names)
         
-        # Replace {variable} patterns with actual values
-        def replace_var(match):
-            var_name = match.group(1)
-            return str(variables.get(var_name, f"{{{var_name}}}"))  # Keep unfound variables as-is
+        # Chunk-dependent sections differ for every sample - don't hold on to them
+        if per_sample:
+            return format_string.format(*values)
+        
+        # Agent-level sections repeat for every sample of the agent
+        key = (format_string, values)
+        rendered = self._render_cache.get(key)
+        if rendered is None:
+            rendered = format_string.format(*values)
+            if len(self._render_cache) >= self._RENDER_CACHE_SIZE:
+                self._render_cache.pop(next(iter(self._render_cache)))
+            self._render_cache[key] = rendered
+        return rendered
+    
+    @classmethod
+    @lru_cache(maxsize=256)
+    def _compile_template(cls, template_text: str) -> Tuple[str, Tuple[str, ...], bool]:
+        """Rewrite {variable} placeholders as positional str.format fields and flag chunk.* use (once per text)"""
+        parts = []
+        var_names = []
+        position = 0
         
-        # Use regex to find and replace all {variable} patterns
-        filled_text = re.sub(r'\{([^}]+)\}', replace_var, template_text)
+        for match in cls._VAR_RE.finditer(template_text):
+            # Literal braces elsewhere in the text must not be parsed by str.format
+            literal = template_text[position:match.start()]
+            parts.append(literal.replace('{', '{{').replace('}', '}}'))
+            parts.append(f"{{{len(var_names)}}}")
+            var_names.append(match.group(1))
+            position = match.end()
         
-        return filled_text
+        parts.append(template_text[position:].replace('{', '{{').replace('}', '}}'))
+        per_sample = any(var_name.startswith('chunk.') for var_name in var_names)
+        return ''.join(parts), tuple(var_names), per_sample
     
     def get_template_info(self, template_type: str) -> Dict[str, Any]:
         """Get information about a specific template"""
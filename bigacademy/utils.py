@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+BigAcademy Utilities
+Small helpers shared by the package, its scripts and tests
+"""
+
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, is_dataclass
+from typing import Any, Callable, List, Optional
+import contextlib
+import heapq
+import io
+import itertools
+import json
+import sys
+import threading
+
+try:
+    import orjson
+    
+    def jsonl_line(obj: Any) -> bytes:
+        """One JSON Lines record (orjson serializes dataclasses without asdict()'s deep copy)"""
+        return orjson.dumps(obj, option=orjson.OPT_APPEND_NEWLINE)
+    
+    def json_indented(obj: Any) -> bytes:
+        """Pretty-printed JSON document"""
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    
+    json_loads = orjson.loads
+except ImportError:  # fall back to the stdlib codec
+    def jsonl_line(obj: Any) -> bytes:
+        """One JSON Lines record"""
+        if is_dataclass(obj):
+            obj = asdict(obj)
+        return (json.dumps(obj, ensure_ascii=False) + '\n').encode('utf-8')
+    
+    def json_indented(obj: Any) -> bytes:
+        """Pretty-printed JSON document"""
+        if is_dataclass(obj):
+            obj = asdict(obj)
+        return json.dumps(obj, indent=2, ensure_ascii=False).encode('utf-8')
+    
+    json_loads = json.loads
+
+@contextlib.contextmanager
+def buffered_stdout():
+    """Collect printed output and write it to stdout in one go"""
+    buf = io.StringIO()
+    old_stdout = sys.stdout
+    sys.stdout = buf
+    try:
+        yield buf
+    finally:
+        sys.stdout = old_stdout
+        old_stdout.write(buf.getvalue())
+
+_thread_output = threading.local()
+
+class ThreadRoutedStdout:
+    """stdout proxy that sends a thread's writes to its own buffer when it has one"""
+    
+    def __init__(self, stream):
+        self._stream = stream
+    
+    def write(self, text):
+        return getattr(_thread_output, 'buffer', self._stream).write(text)
+    
+    def __getattr__(self, name):
+        return getattr(self._stream, name)
+
+def run_captured(test: Callable[[], Any], buffer: io.StringIO) -> Any:
+    """Run a test with this thread's output collected in buffer"""
+    _thread_output.buffer = buffer
+    try:
+        return test()
+    finally:
+        del _thread_output.buffer
+
+def run_concurrently(tests: List[Callable[[], Any]]) -> List[Any]:
+    """Run tests in parallel threads, then print each one's output in order; returns their results"""
+    buffers = [io.StringIO() for _ in tests]
+    
+    with contextlib.redirect_stdout(ThreadRoutedStdout(sys.stdout)), \
+            ThreadPoolExecutor(max_workers=len(tests)) as executor:
+        futures = [executor.submit(run_captured, test, buffer) for test, buffer in zip(tests, buffers)]
+    
+    for buffer in buffers:
+        sys.stdout.write(buffer.getvalue())
+    return [future.result() for future in futures]
+
+class StreamedResult:
+    """Running totals and most relevant chunks of a chunk stream that is never held in memory"""
+    
+    def __init__(self, top_n: int = 10):
+        self.top_n = top_n
+        self.total_chunks = 0
+        self.total_tokens = 0
+        self.relevance_sum = 0.0
+        self.file_types = Counter()
+        self._top = []  # min-heap of (relevance_score, -arrival, chunk)
+    
+    def track(self, chunks):
+        """Pass chunks through, updating totals and the top-N heap"""
+        for chunk in chunks:
+            self.total_chunks += 1
+            self.total_tokens += chunk.size_tokens
+            self.relevance_sum += chunk.relevance_score
+            self.file_types[chunk.file_type or "no_extension"] += 1
+            
+            entry = (chunk.relevance_score, -self.total_chunks, chunk)
+            if len(self._top) < self.top_n:
+                heapq.heappush(self._top, entry)
+            else:
+                heapq.heappushpop(self._top, entry)
+            yield chunk
+    
+    @property
+    def chunks(self):
+        """The top-N chunks, most relevant first (ties keep extraction order)"""
+        return [chunk for _, _, chunk in sorted(self._top, reverse=True)]
+    
+    @property
+    def average_relevance(self) -> float:
+        return self.relevance_sum / self.total_chunks if self.total_chunks else 0.0
+
+def stream_into_db(extractor, db, repo_url: str, agent_profile) -> Optional[StreamedResult]:
+    """Extract a repository straight into the graph database, batch by batch"""
+    result = StreamedResult()
+    chunks = result.track(extractor.iter_chunks(repo_url, agent_profile))
+    
+    # Peek so that an empty extraction doesn't record a session
+    first_chunk = next(chunks, None)
+    session_id = None
+    if first_chunk is not None:
+        session_id = db.store_chunks_streaming(
+            itertools.chain([first_chunk], chunks), agent_profile,
+            repo_url, "github_repository",
+            extraction_metadata=extractor.extraction_metadata(repo_url, agent_profile)
+        )
+    
+    print(f"\n✅ Extraction completed!")
+    print(f"   Total chunks: {result.total_chunks}")
+    print(f"   Total tokens: {result.total_tokens:,}")
+    
+    if session_id is None:
+        print("⚠️  No relevant chunks found for this agent")
+        return None
+    
+    print(f"   Session ID: {session_id[:8]}")
+    return result
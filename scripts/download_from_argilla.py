@@ -12,6 +12,18 @@ from datetime import datetime
 
 import argilla as rg
 
+# JSON codec helpers from bigacademy.utils (orjson when installed)
+from bigacademy.utils import jsonl_line, json_indented
+
+# Numeric score for each quality label
+QUALITY_SCORES = {
+    'excellent': 5,
+    'good': 4,
+    'fair': 3,
+    'poor': 2,
+    'terrible': 1
+}
+
 def setup_argilla_connection():
     """Setup connection to Argilla server"""
     api_url = os.getenv('ARGILLA_API_URL', 'http://localhost:6900')
@@ -31,6 +43,10 @@ def download_from_argilla(dataset_name: str) -> List[Dict[str, Any]]:
         
         enhanced_samples = []
         
+        # Every sample of one download shares the same review instant
+        now_iso = datetime.now().isoformat()
+        quality_get = QUALITY_SCORES.get
+        
         for record in dataset:
             try:
                 # Extract original data from metadata
@@ -45,14 +61,7 @@ def download_from_argilla(dataset_name: str) -> List[Dict[str, Any]]:
                 if record.annotation:
                     annotation = record.annotation
                     # Convert quality label to numeric score
-                    quality_mapping = {
-                        'excellent': 5,
-                        'good': 4,
-                        'fair': 3,
-                        'poor': 2,
-                        'terrible': 1
-                    }
-                    quality_score = quality_mapping.get(annotation, 3)
+                    quality_score = quality_get(annotation, 3)
                 
                 # Create enhanced sample
                 enhanced_sample = {
@@ -65,10 +74,10 @@ def download_from_argilla(dataset_name: str) -> List[Dict[str, Any]]:
                         **metadata,
                         'human_annotation': annotation,
                         'quality_score': quality_score,
-                        'reviewed_at': datetime.now().isoformat(),
+                        'reviewed_at': now_iso,
                         'argilla_dataset': dataset_name
                     },
-                    'created_at': datetime.now().isoformat()
+                    'created_at': now_iso
                 }
                 
                 enhanced_samples.append(enhanced_sample)
@@ -94,10 +103,8 @@ def save_enhanced_dataset(samples: List[Dict[str, Any]],
     
     if format == 'jsonl':
         # Save as JSONL (one JSON object per line)
-        with open(output_path, 'w', encoding='utf-8') as f:
-            for sample in samples:
-                json.dump(sample, f, ensure_ascii=False)
-                f.write('\n')
+        with open(output_path, 'wb', buffering=1 << 20) as f:
+            f.writelines(jsonl_line(sample) for sample in samples)
     
     elif format == 'json':
         # Save as JSON array
@@ -106,20 +113,16 @@ def save_enhanced_dataset(samples: List[Dict[str, Any]],
     
     elif format == 'distilabel':
         # Save in Distilabel format for training
-        distilabel_samples = []
-        for sample in samples:
-            distilabel_sample = {
-                "instruction": sample['prompt'],
-                "output": sample['expected_response'],
-                "input": "",
-                "metadata": sample['metadata']
-            }
-            distilabel_samples.append(distilabel_sample)
-        
-        with open(output_path, 'w', encoding='utf-8') as f:
-            for sample in distilabel_samples:
-                json.dump(sample, f, ensure_ascii=False)
-                f.write('\n')
+        with open(output_path, 'wb', buffering=1 << 20) as f:
+            f.writelines(
+                jsonl_line({
+                    "instruction": sample['prompt'],
+                    "output": sample['expected_response'],
+                    "input": "",
+                    "metadata": sample['metadata']
+                })
+                for sample in samples
+            )
     
     else:
         raise ValueError(f"Unsupported format: {format}")
@@ -128,76 +131,59 @@ def save_enhanced_dataset(samples: List[Dict[str, Any]],
 
 def analyze_annotations(samples: List[Dict[str, Any]]) -> Dict[str, Any]:
     """Analyze human annotations for insights"""
-    analysis = {
-        'total_samples': len(samples),
-        'annotated_samples': 0,
-        'quality_distribution': {},
-        'template_quality': {},
-        'agent_quality': {},
-        'avg_quality_score': 0,
-        'low_quality_samples': []
-    }
-    
-    quality_scores = []
-    
+    quality_distribution: Dict[str, int] = {}
+    template_scores: Dict[str, List[int]] = {}
+    agent_scores: Dict[str, List[int]] = {}
+    low_quality_samples = []
+    annotated_samples = 0
+    quality_total = 0
+    quality_count = 0
+    
+    # Single pass, grouping scores straight into per-template/per-agent lists
     for sample in samples:
         metadata = sample.get('metadata', {})
-        quality_score = metadata.get('quality_score')
         annotation = metadata.get('human_annotation')
+        if not annotation:
+            continue
+        
+        quality_score = metadata.get('quality_score')
         template_type = sample.get('template_type', 'unknown')
-        agent_name = sample.get('agent_name', 'unknown')
+        score = quality_score or 3
         
-        if annotation:
-            analysis['annotated_samples'] += 1
-            
-            # Quality distribution
-            if annotation not in analysis['quality_distribution']:
-                analysis['quality_distribution'][annotation] = 0
-            analysis['quality_distribution'][annotation] += 1
-            
-            # Template quality
-            if template_type not in analysis['template_quality']:
-                analysis['template_quality'][template_type] = []
-            analysis['template_quality'][template_type].append(quality_score or 3)
-            
-            # Agent quality
-            if agent_name not in analysis['agent_quality']:
-                analysis['agent_quality'][agent_name] = []
-            analysis['agent_quality'][agent_name].append(quality_score or 3)
+        annotated_samples += 1
+        quality_distribution[annotation] = quality_distribution.get(annotation, 0) + 1
+        template_scores.setdefault(template_type, []).append(score)
+        agent_scores.setdefault(sample.get('agent_name', 'unknown'), []).append(score)
+        
+        if quality_score:
+            quality_total += quality_score
+            quality_count += 1
             
-            if quality_score:
-                quality_scores.append(quality_score)
-                
-                # Track low quality samples
-                if quality_score <= 2:
-                    analysis['low_quality_samples'].append({
-                        'id': sample.get('id'),
-                        'template_type': template_type,
-                        'quality_score': quality_score,
-                        'relevance_score': metadata.get('relevance_score', 0)
-                    })
-    
-    # Calculate averages
-    if quality_scores:
-        analysis['avg_quality_score'] = sum(quality_scores) / len(quality_scores)
-    
-    # Calculate template averages
-    for template_type, scores in analysis['template_quality'].items():
-        analysis['template_quality'][template_type] = {
+            # Track low quality samples
+            if quality_score <= 2:
+                low_quality_samples.append({
+                    'id': sample.get('id'),
+                    'template_type': template_type,
+                    'quality_score': quality_score,
+                    'relevance_score': metadata.get('relevance_score', 0)
+                })
+    
+    def summarize(scores: List[int]) -> Dict[str, Any]:
+        return {
             'avg_score': sum(scores) / len(scores),
             'sample_count': len(scores),
             'scores': scores
         }
     
-    # Calculate agent averages
-    for agent_name, scores in analysis['agent_quality'].items():
-        analysis['agent_quality'][agent_name] = {
-            'avg_score': sum(scores) / len(scores),
-            'sample_count': len(scores),
-            'scores': scores
-        }
-    
-    return analysis
+    return {
+        'total_samples': len(samples),
+        'annotated_samples': annotated_samples,
+        'quality_distribution': quality_distribution,
+        'template_quality': {name: summarize(scores) for name, scores in template_scores.items()},
+        'agent_quality': {name: summarize(scores) for name, scores in agent_scores.items()},
+        'avg_quality_score': quality_total / quality_count if quality_count else 0,
+        'low_quality_samples': low_quality_samples
+    }
 
 def main():
     """Main function"""
@@ -241,8 +227,8 @@ def main():
             analysis = analyze_annotations(enhanced_samples)
             analysis_path = output_path.with_suffix('.analysis.json')
             
-            with open(analysis_path, 'w', encoding='utf-8') as f:
-                json.dump(analysis, f, indent=2, ensure_ascii=False)
+            with open(analysis_path, 'wb') as f:
+                f.write(json_indented(analysis))
             
             print(f"\n📊 Annotation Analysis:")
             print(f"   Total samples: {analysis['total_samples']}")
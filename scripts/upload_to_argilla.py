@@ -12,6 +12,9 @@ from typing import List, Dict, Any
 import argilla as rg
 from argilla import Text, TextClassification
 
+# JSON codec helper from bigacademy.utils (orjson when installed)
+from bigacademy.utils import json_loads
+
 def setup_argilla_connection():
     """Setup connection to Argilla server"""
     api_url = os.getenv('ARGILLA_API_URL', 'http://localhost:6900')
@@ -22,22 +25,70 @@ def setup_argilla_connection():
     print(f"✅ Connected to Argilla at {api_url}")
     print(f"   Workspace: {workspace}")
 
+# Fields whose values repeat across most samples of a dataset
+_SHARED_SAMPLE_FIELDS = ('agent_name', 'template_type')
+_SHARED_METADATA_FIELDS = ('source_path', 'source_url', 'agent_name', 'template_type')
+
+def _share_strings(values: Dict[str, Any], keys, str_cache: Dict[str, str]):
+    """Replace repeated string values with one shared instance"""
+    for key in keys:
+        value = values.get(key)
+        if isinstance(value, str):
+            values[key] = str_cache.setdefault(value, value)
+
 def load_bigacademy_dataset(file_path: Path) -> List[Dict[str, Any]]:
     """Load BigAcademy JSONL dataset"""
     samples = []
+    str_cache: Dict[str, str] = {}
     
-    with open(file_path, 'r', encoding='utf-8') as f:
-        for line_num, line in enumerate(f, 1):
-            try:
-                sample = json.loads(line.strip())
-                samples.append(sample)
-            except json.JSONDecodeError as e:
-                print(f"⚠️  Skipping invalid JSON on line {line_num}: {e}")
-                continue
+    # Read the whole file at once and parse each line straight from bytes
+    with open(file_path, 'rb') as f:
+        data = f.read()
+    
+    for line_num, line in enumerate(data.split(b'\n'), 1):
+        if not line.strip():
+            continue
+        try:
+            sample = json_loads(line)
+        except json.JSONDecodeError as e:  # orjson's error subclasses it
+            print(f"⚠️  Skipping invalid JSON on line {line_num}: {e}")
+            continue
+        
+        if isinstance(sample, dict):
+            _share_strings(sample, _SHARED_SAMPLE_FIELDS, str_cache)
+            metadata = sample.get('metadata')
+            if isinstance(metadata, dict):
+                _share_strings(metadata, _SHARED_METADATA_FIELDS, str_cache)
+        samples.append(sample)
     
     print(f"📊 Loaded {len(samples)} samples from {file_path}")
     return samples
 
+def _record_fields(i: int, sample: Dict[str, Any]) -> Dict[str, Any]:
+    """Build the Argilla record fields for one BigAcademy sample"""
+    # Extract fields from BigAcademy format
+    prompt = sample.get('prompt', '')
+    response = sample.get('expected_response', '')
+    metadata = sample.get('metadata', {})
+    
+    return {
+        # Full text for review
+        'text': f"**PROMPT:**\n{prompt}\n\n**RESPONSE:**\n{response}",
+        'metadata': {
+            'sample_id': sample.get('id', f'sample_{i}'),
+            'agent_name': sample.get('agent_name', 'unknown'),
+            'template_type': sample.get('template_type', 'unknown'),
+            'relevance_score': metadata.get('relevance_score', 0),
+            'source_path': metadata.get('source_path', ''),
+            'source_url': metadata.get('source_url', ''),
+            'chunk_tokens': metadata.get('chunk_tokens', 0),
+            'prompt_length': len(prompt),
+            'response_length': len(response),
+            'original_prompt': prompt,
+            'original_response': response
+        }
+    }
+
 def convert_to_argilla_records(samples: List[Dict[str, Any]], 
                                dataset_name: str) -> List[rg.TextClassificationRecord]:
     """Convert BigAcademy samples to Argilla records"""
@@ -45,30 +96,9 @@ def convert_to_argilla_records(samples: List[Dict[str, Any]],
     
     for i, sample in enumerate(samples):
         try:
-            # Extract fields from BigAcademy format
-            prompt = sample.get('prompt', '')
-            response = sample.get('expected_response', '')
-            metadata = sample.get('metadata', {})
-            
-            # Create full text for review
-            full_text = f"**PROMPT:**\n{prompt}\n\n**RESPONSE:**\n{response}"
-            
             # Create Argilla record
             record = rg.TextClassificationRecord(
-                text=full_text,
-                metadata={
-                    'sample_id': sample.get('id', f'sample_{i}'),
-                    'agent_name': sample.get('agent_name', 'unknown'),
-                    'template_type': sample.get('template_type', 'unknown'),
-                    'relevance_score': metadata.get('relevance_score', 0),
-                    'source_path': metadata.get('source_path', ''),
-                    'source_url': metadata.get('source_url', ''),
-                    'chunk_tokens': metadata.get('chunk_tokens', 0),
-                    'prompt_length': len(prompt),
-                    'response_length': len(response),
-                    'original_prompt': prompt,
-                    'original_response': response
-                },
+                **_record_fields(i, sample),
                 prediction=[('quality', 0.5)],  # Default prediction for rating
                 annotation=None  # To be filled by human reviewers
             )
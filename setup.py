@@ -27,6 +27,13 @@ setup(
     include_package_data=True,
     python_requires=">=3.10",
     install_requires=REQUIREMENTS,
+    extras_require={
+        # Optional C accelerators, picked up automatically when installed
+        "fast": [
+            "pyahocorasick>=2.0.0",
+            "orjson>=3.8.0",
+        ],
+    },
     entry_points={
         "console_scripts": [
             "bigacademy=bigacademy.cli:main",
@@ -10,31 +10,59 @@ from bigacademy.core.agent_profiles import AgentProfileManager
 from bigacademy.core.graph_db import GraphDB
 from bigacademy.generators.prompt_templates import PromptTemplateManager
 from bigacademy.generators.dataset_generator import DatasetGenerator
+from bigacademy.utils import buffered_stdout, json_loads
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-import json
+import atexit
+import bisect
+import functools
+import itertools
+import multiprocessing
+import os
 
+# Test configuration and data locations
+_AGENTS_DIR = Path(__file__).resolve().parent / "configs" / "agents"
+_TEMPLATES_DIR = Path(__file__).resolve().parent / "configs" / "templates"
+_OUT_DIR = Path("test_data/generated_datasets")
+_ARCHITECT_DB = Path("test_data/fastapi_minimal_architect.db")
+_DEVELOPER_DB = Path("test_data/pydantic_developer.db")
+
+@functools.lru_cache(maxsize=1)
+def _get_setup():
+    """Load agent profiles and templates once per test run"""
+    agent_manager = AgentProfileManager(_AGENTS_DIR)
+    template_manager = PromptTemplateManager(_TEMPLATES_DIR)
+    return agent_manager, template_manager
+
+@functools.lru_cache(maxsize=None)
+def _get_graph_db(db_path: Path) -> GraphDB:
+    """Open each test database once (read-only), closed when the run exits"""
+    graph_db = GraphDB(db_path, read_only=True)
+    atexit.register(graph_db.close)
+    return graph_db
+
+@buffered_stdout()
 def test_dataset_generator_setup():
     """Test dataset generator initialization"""
     print("🎯 Testing Dataset Generator Setup")
     print("=" * 50)
     
     # Load components
-    agent_manager = AgentProfileManager(Path("/Users/franckbirba/DEV/TEST-CREWAI/bigacademy/configs/agents"))
-    template_manager = PromptTemplateManager(Path("/Users/franckbirba/DEV/TEST-CREWAI/bigacademy/configs/templates"))
+    agent_manager, template_manager = _get_setup()
     
     # Test with architect database
-    db_path = Path("test_data/fastapi_minimal_architect.db")
+    db_path = _ARCHITECT_DB
     if not db_path.exists():
         print(f"❌ Database not found: {db_path}")
         return None, None, None
     
-    graph_db = GraphDB(db_path)
+    graph_db = _get_graph_db(db_path)
     
     # Initialize dataset generator
     dataset_generator = DatasetGenerator(
         graph_db=graph_db,
         template_manager=template_manager,
-        output_dir=Path("test_data/generated_datasets")
+        output_dir=_OUT_DIR
     )
     
     print("✅ Dataset generator initialized")
@@ -43,6 +71,7 @@ def test_dataset_generator_setup():
     
     return agent_manager, dataset_generator, graph_db
 
+@buffered_stdout()
 def test_knowledge_chunk_extraction():
     """Test extracting knowledge chunks for dataset generation"""
     print("\n📚 Testing Knowledge Chunk Extraction")
@@ -64,10 +93,15 @@ def test_knowledge_chunk_extraction():
     # Test knowledge extraction with different relevance thresholds
     relevance_thresholds = [0.1, 0.2, 0.3]
     
+    # Query once at the lowest threshold; chunks come back sorted by relevance
+    # (highest first), so each higher threshold is a prefix of that list
+    all_chunks = dataset_generator._get_agent_knowledge_chunks(
+        architect, min(relevance_thresholds)
+    )
+    negated_scores = [-chunk_data['chunk'].relevance_score for chunk_data in all_chunks]
+    
     for threshold in relevance_thresholds:
-        knowledge_chunks = dataset_generator._get_agent_knowledge_chunks(
-            architect, threshold
-        )
+        knowledge_chunks = all_chunks[:bisect.bisect_right(negated_scores, -threshold)]
         
         print(f"   📊 Relevance >= {threshold}: {len(knowledge_chunks)} chunks")
         
@@ -78,10 +112,10 @@ def test_knowledge_chunk_extraction():
                 source = chunk_data['source_info']
                 print(f"      {i+1}. {chunk.source_path} (rel: {chunk.relevance_score:.3f}, tokens: {chunk.size_tokens})")
                 print(f"         Source: {source['url']}")
-    
-    graph_db.close()
+
     return knowledge_chunks if 'knowledge_chunks' in locals() else []
 
+@buffered_stdout()
 def test_single_sample_generation():
     """Test generating individual dataset samples"""
     print("\n🎨 Testing Single Sample Generation")
@@ -108,17 +142,24 @@ def test_single_sample_generation():
     # Test different template types
     template_types = ["question_answer", "code_review", "implementation_task"]
     
-    for template_type in template_types:
-        print(f"\n📝 Testing template: {template_type}")
-        
-        try:
-            # Generate single sample
-            sample = dataset_generator._generate_single_sample(
+    # Generate one sample per template concurrently; report in template order
+    with ThreadPoolExecutor(max_workers=len(template_types)) as executor:
+        futures = {
+            template_type: executor.submit(
+                dataset_generator._generate_single_sample,
                 agent_profile=architect,
                 template_type=template_type,
                 chunk_data=knowledge_chunks[0],  # Use first chunk
                 sample_index=0
             )
+            for template_type in template_types
+        }
+    
+    for template_type, future in futures.items():
+        print(f"\n📝 Testing template: {template_type}")
+        
+        try:
+            sample = future.result()
             
             if sample:
                 print(f"   ✅ Generated sample ID: {sample.id[:8]}")
@@ -135,9 +176,9 @@ def test_single_sample_generation():
                 
         except Exception as e:
             print(f"   ❌ Error: {e}")
-    
-    graph_db.close()
 
+
+@buffered_stdout()
 def test_batch_generation():
     """Test generating complete dataset batches"""
     print("\n📦 Testing Batch Generation")
@@ -178,10 +219,10 @@ def test_batch_generation():
     # Show generation statistics
     stats = dataset_generator.get_generation_stats()
     print(f"📈 Generation stats: {stats}")
-    
-    graph_db.close()
+
     return dataset_batches
 
+@buffered_stdout()
 def test_dataset_saving():
     """Test saving datasets in different formats"""
     print("\n💾 Testing Dataset Saving")
@@ -216,66 +257,84 @@ def test_dataset_saving():
         sample_file = saved_files[0]
         print(f"\n📁 Sample file content ({sample_file.name}):")
         
-        with open(sample_file, 'r', encoding='utf-8') as f:
+        with open(sample_file, 'rb') as f:
             first_line = f.readline().strip()
             if first_line:
-                sample_data = json.loads(first_line)
+                sample_data = json_loads(first_line)
                 print(f"   Sample ID: {sample_data.get('id', 'unknown')[:8]}")
                 print(f"   Agent: {sample_data.get('agent_name', 'unknown')}")
                 print(f"   Template: {sample_data.get('template_type', 'unknown')}")
                 print(f"   Prompt length: {len(sample_data.get('prompt', ''))}")
-    
-    graph_db.close()
+
     return saved_files, distilabel_file
 
+def _prefetch(path: Path):
+    """Ask the kernel to start reading a file into the page cache"""
+    if not hasattr(os, 'posix_fadvise'):  # e.g. macOS
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+    finally:
+        os.close(fd)
+
+def _run_one_agent(agent_name: str, db_path: Path, templates_dir: Path,
+                   profiles_dir: Path, out_dir: Path):
+    """Generate a small dataset for one agent (runs in a worker process)"""
+    print(f"\n🤖 Processing agent: {agent_name}")
+    
+    # Load agent and database
+    agent_manager = AgentProfileManager(profiles_dir)
+    agent_profile = agent_manager.get_profile(agent_name)
+    if not agent_profile:
+        print(f"❌ Could not load profile for {agent_name}")
+        return []
+    
+    template_manager = PromptTemplateManager(templates_dir)
+    graph_db = GraphDB(db_path, read_only=True)
+    try:
+        dataset_generator = DatasetGenerator(
+            graph_db=graph_db,
+            template_manager=template_manager,
+            output_dir=out_dir
+        )
+        
+        # Generate small dataset for each agent
+        return dataset_generator.generate_agent_dataset(
+            agent_profile=agent_profile,
+            template_types=["question_answer"],  # Just one template for speed
+            max_samples_per_template=3,
+            min_relevance_score=0.2
+        )
+    finally:
+        graph_db.close()
+
 def test_multi_agent_dataset():
     """Test generating datasets for multiple agents"""
     print("\n👥 Testing Multi-Agent Dataset Generation")
     print("=" * 50)
     
-    # Load both agents
-    agent_manager = AgentProfileManager(Path("/Users/franckbirba/DEV/TEST-CREWAI/bigacademy/configs/agents"))
-    template_manager = PromptTemplateManager(Path("/Users/franckbirba/DEV/TEST-CREWAI/bigacademy/configs/templates"))
-    
     agents = ["solution_architect", "python_developer"]
     databases = {
-        "solution_architect": "test_data/fastapi_minimal_architect.db",
-        "python_developer": "test_data/pydantic_developer.db"
+        "solution_architect": _ARCHITECT_DB,
+        "python_developer": _DEVELOPER_DB
     }
     
-    all_batches = []
-    
+    jobs = []
     for agent_name in agents:
-        db_path = Path(databases[agent_name])
+        db_path = databases[agent_name]
         if not db_path.exists():
             print(f"⚠️  Database not found for {agent_name}: {db_path}")
             continue
-        
-        print(f"\n🤖 Processing agent: {agent_name}")
-        
-        # Load agent and database
-        agent_profile = agent_manager.get_profile(agent_name)
-        if not agent_profile:
-            print(f"❌ Could not load profile for {agent_name}")
-            continue
-        
-        graph_db = GraphDB(db_path)
-        dataset_generator = DatasetGenerator(
-            graph_db=graph_db,
-            template_manager=template_manager,
-            output_dir=Path(f"test_data/generated_datasets/{agent_name}")
-        )
-        
-        # Generate small dataset for each agent
-        batches = dataset_generator.generate_agent_dataset(
-            agent_profile=agent_profile,
-            template_types=["question_answer"],  # Just one template for speed
-            max_samples_per_template=3,
-            min_relevance_score=0.2
-        )
-        
-        all_batches.extend(batches)
-        graph_db.close()
+        _prefetch(db_path)  # readahead overlaps with worker startup
+        jobs.append((agent_name, db_path, _TEMPLATES_DIR, _AGENTS_DIR, _OUT_DIR / agent_name))
+    
+    # Each agent has its own database - generate them in separate processes
+    all_batches = []
+    if jobs:
+        with multiprocessing.Pool(processes=min(len(jobs), os.cpu_count() or 1)) as pool:
+            results = pool.starmap(_run_one_agent, jobs)
+        all_batches = list(itertools.chain.from_iterable(results))
     
     print(f"\n✅ Multi-agent generation complete!")
     print(f"   Total batches: {len(all_batches)}")
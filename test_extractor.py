@@ -9,16 +9,19 @@ sys.path.append('/Users/franckbirba/DEV/TEST-CREWAI/bigacademy')
 from bigacademy.core.agent_profiles import AgentProfileManager
 from bigacademy.extractors.github_extractor import GitHubExtractor
 from pathlib import Path
+from itertools import islice
+from statistics import fmean
 import json
 
+_AGENTS_DIR = Path(__file__).resolve().parent / "configs" / "agents"
+
 def test_agent_profiles():
     """Test loading agent profiles from config"""
     print("🎓 Testing Agent Profile Loading")
     print("=" * 50)
     
     # Initialize profile manager
-    profiles_dir = Path("/Users/franckbirba/DEV/TEST-CREWAI/bigacademy/configs/agents")
-    manager = AgentProfileManager(profiles_dir)
+    manager = AgentProfileManager(_AGENTS_DIR)
     
     # Load all profiles
     profiles = manager.load_all_profiles()
@@ -95,7 +98,7 @@ def test_agent_specific_extraction():
     print("=" * 50)
     
     # Load agent profiles
-    manager = AgentProfileManager(Path("/Users/franckbirba/DEV/TEST-CREWAI/bigacademy/configs/agents"))
+    manager = AgentProfileManager(_AGENTS_DIR)
     architect_profile = manager.get_profile("solution_architect")
     developer_profile = manager.get_profile("python_developer")
     
@@ -104,7 +107,13 @@ def test_agent_specific_extraction():
         return
     
     # Initialize extractor
-    extractor = GitHubExtractor(config={'clone_depth': 1, 'timeout': 120})
+    # Both agents extract the same repository: the second run reuses the first clone
+    extractor = GitHubExtractor(config={
+        'clone_depth': 1,
+        'timeout': 120,
+        'cache_dir': 'test_data/_repo_cache',
+        'cache_max_age': 3600
+    })
     
     # Test with BigTune repository (local, faster)
     test_repo = "https://github.com/franckbirba/bigtune"
@@ -119,11 +128,11 @@ def test_agent_specific_extraction():
         print(f"✅ Architect extraction completed!")
         print(f"   Total chunks: {architect_result.total_chunks}")
         print(f"   Total tokens: {architect_result.total_tokens}")
-        print(f"   Average relevance: {sum(c.relevance_score for c in architect_result.chunks) / len(architect_result.chunks) if architect_result.chunks else 0:.2f}")
+        print(f"   Average relevance: {fmean(c.relevance_score for c in architect_result.chunks) if architect_result.chunks else 0:.2f}")
         
         # Show top relevant chunks
         print(f"   Top relevant files:")
-        for chunk in architect_result.chunks[:5]:
+        for chunk in architect_result.top_k(5):
             print(f"     - {chunk.source_path} (relevance: {chunk.relevance_score:.2f})")
             
     except Exception as e:
@@ -138,11 +147,11 @@ def test_agent_specific_extraction():
         print(f"✅ Developer extraction completed!")
         print(f"   Total chunks: {developer_result.total_chunks}")
         print(f"   Total tokens: {developer_result.total_tokens}")
-        print(f"   Average relevance: {sum(c.relevance_score for c in developer_result.chunks) / len(developer_result.chunks) if developer_result.chunks else 0:.2f}")
+        print(f"   Average relevance: {fmean(c.relevance_score for c in developer_result.chunks) if developer_result.chunks else 0:.2f}")
         
         # Show top relevant chunks
         print(f"   Top relevant files:")
-        for chunk in developer_result.chunks[:5]:
+        for chunk in developer_result.top_k(5):
             print(f"     - {chunk.source_path} (relevance: {chunk.relevance_score:.2f})")
             
     except Exception as e:
@@ -164,12 +173,12 @@ def test_agent_specific_extraction():
         
         print(f"   Architect-only files: {len(arch_only)}")
         if arch_only:
-            for file in list(arch_only)[:3]:
+            for file in islice(arch_only, 3):
                 print(f"     - {file}")
         
         print(f"   Developer-only files: {len(dev_only)}")
         if dev_only:
-            for file in list(dev_only)[:3]:
+            for file in islice(dev_only, 3):
                 print(f"     - {file}")
 
 def main():
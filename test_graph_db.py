@@ -6,61 +6,80 @@ Test BigAcademy Knowledge Graph Database
 import sys
 sys.path.append('/Users/franckbirba/DEV/TEST-CREWAI/bigacademy')
 
-from bigacademy.core.agent_profiles import AgentProfileManager
-from bigacademy.core.graph_db import GraphDB
-from bigacademy.extractors.github_extractor import GitHubExtractor
+from bigacademy.utils import buffered_stdout
+from collections import Counter
+from operator import itemgetter
 from pathlib import Path
+from typing import TYPE_CHECKING
+import functools
+import heapq
 import json
+import sqlite3
+import uuid
 
+if TYPE_CHECKING:  # imported lazily at runtime, inside the tests
+    from bigacademy.core.agent_profiles import AgentProfileManager
+    from bigacademy.core.graph_db import GraphDB
+
+_AGENTS_DIR = Path(__file__).resolve().parent / "configs" / "agents"
+
+@functools.lru_cache(maxsize=1)
+def _get_agent_manager() -> "AgentProfileManager":
+    """Load agent profiles once per test run"""
+    from bigacademy.core.agent_profiles import AgentProfileManager
+    
+    return AgentProfileManager(_AGENTS_DIR)
+
+@buffered_stdout()
 def test_graph_db_basic():
     """Test basic graph database operations"""
+    from bigacademy.core.graph_db import GraphDB
+    
     print("🧠 Testing Graph Database Basic Operations")
     print("=" * 50)
     
     # Initialize database (will create if not exists)
-    db = GraphDB(Path("test_data/test_knowledge.db"))
-    
-    # Test adding nodes
-    print("📝 Testing node operations...")
-    
-    # Add test nodes
-    agent_id = db.add_node("Agent", {
-        "name": "test_architect",
-        "title": "Test Solution Architect",
-        "technologies": ["fastapi", "docker"]
-    })
-    
-    tech_id = db.add_node("Technology", {
-        "name": "fastapi",
-        "version": "0.104.0"
-    })
-    
-    chunk_id = db.add_node("KnowledgeChunk", {
-        "content": "FastAPI is a modern web framework",
-        "source_path": "test.py",
-        "relevance_score": 0.8
-    })
+    db = GraphDB(Path("test_data/test_knowledge.db"), test_mode=True)
+    
+    # Test adding nodes and relationships (one transaction for all of them)
+    print("📝 Testing node and relationship operations...")
+    
+    agent_id, tech_id, chunk_id = (str(uuid.uuid4()) for _ in range(3))
+    
+    edge_ids = db.bulk_insert(
+        nodes=[
+            (agent_id, "Agent", {
+                "name": "test_architect",
+                "title": "Test Solution Architect",
+                "technologies": ["fastapi", "docker"]
+            }),
+            (tech_id, "Technology", {
+                "name": "fastapi",
+                "version": "0.104.0"
+            }),
+            (chunk_id, "KnowledgeChunk", {
+                "content": "FastAPI is a modern web framework",
+                "source_path": "test.py",
+                "relevance_score": 0.8
+            })
+        ],
+        edges=[
+            (agent_id, tech_id, "REQUIRES", 1.0),
+            (agent_id, chunk_id, "LEARNS_FROM", 0.8),
+            (chunk_id, tech_id, "IMPLEMENTS", 1.0)
+        ]
+    )
     
     print(f"✅ Created nodes: agent={agent_id[:8]}, tech={tech_id[:8]}, chunk={chunk_id[:8]}")
-    
-    # Test adding relationships
-    print("🔗 Testing relationship operations...")
-    
-    rel1_id = db.add_edge(agent_id, tech_id, "REQUIRES")
-    rel2_id = db.add_edge(agent_id, chunk_id, "LEARNS_FROM", weight=0.8)
-    rel3_id = db.add_edge(chunk_id, tech_id, "IMPLEMENTS")
-    
-    print(f"✅ Created relationships: {len([rel1_id, rel2_id, rel3_id])} edges")
+    print(f"✅ Created relationships: {len(edge_ids)} edges")
     
     # Test querying
     print("🔍 Testing queries...")
     
-    # Find nodes by type
-    agents = db.find_nodes("Agent")
-    technologies = db.find_nodes("Technology") 
-    chunks = db.find_nodes("KnowledgeChunk")
+    # Count nodes by type
+    counts = db.count_nodes_by_type()
     
-    print(f"   Found: {len(agents)} agents, {len(technologies)} technologies, {len(chunks)} chunks")
+    print(f"   Found: {counts.get('Agent', 0)} agents, {counts.get('Technology', 0)} technologies, {counts.get('KnowledgeChunk', 0)} chunks")
     
     # Find relationships
     agent_rels = db.get_relationships(agent_id)
@@ -74,11 +93,14 @@ def test_graph_db_basic():
 
 def test_extraction_storage():
     """Test storing extraction results in graph"""
+    from bigacademy.core.graph_db import GraphDB
+    from bigacademy.extractors.github_extractor import GitHubExtractor
+    
     print("\n📊 Testing Extraction Result Storage")
     print("=" * 50)
     
     # Load agent profile
-    manager = AgentProfileManager(Path("/Users/franckbirba/DEV/TEST-CREWAI/bigacademy/configs/agents"))
+    manager = _get_agent_manager()
     architect_profile = manager.get_profile("solution_architect")
     
     if not architect_profile:
@@ -86,7 +108,7 @@ def test_extraction_storage():
         return None
     
     # Initialize graph database
-    db = GraphDB(Path("test_data/extraction_knowledge.db"))
+    db = GraphDB(Path("test_data/extraction_knowledge.db"), test_mode=True)
     
     # Initialize extractor and extract from repository
     extractor = GitHubExtractor(config={'clone_depth': 1, 'timeout': 60})
@@ -123,7 +145,7 @@ def test_extraction_storage():
         print(f"❌ Extraction failed: {e}")
         return test_mock_extraction_storage(db, architect_profile)
 
-def test_mock_extraction_storage(db: GraphDB, agent_profile):
+def test_mock_extraction_storage(db: "GraphDB", agent_profile):
     """Test with mock extraction data"""
     print("🎭 Using mock extraction data...")
     
@@ -176,8 +198,11 @@ def test_mock_extraction_storage(db: GraphDB, agent_profile):
     
     return db
 
+@buffered_stdout()
 def test_graph_analysis():
     """Test graph analysis with NetworkX"""
+    from bigacademy.core.graph_db import GraphDB
+    
     print("\n🕸️  Testing Graph Analysis")
     print("=" * 50)
     
@@ -185,7 +210,7 @@ def test_graph_analysis():
     db = GraphDB(Path("test_data/extraction_knowledge.db"))
     
     # Load agent profile
-    manager = AgentProfileManager(Path("/Users/franckbirba/DEV/TEST-CREWAI/bigacademy/configs/agents"))
+    manager = _get_agent_manager()
     architect_profile = manager.get_profile("solution_architect")
     
     if not architect_profile:
@@ -203,37 +228,32 @@ def test_graph_analysis():
     
     if graph.number_of_nodes() > 0:
         # Analyze node types
-        node_types = {}
-        for node_id, data in graph.nodes(data=True):
-            node_type = data.get('node_type', 'unknown')
-            node_types[node_type] = node_types.get(node_type, 0) + 1
+        node_types = Counter(data.get('node_type', 'unknown') for _, data in graph.nodes(data=True))
         
-        print(f"   Node types: {node_types}")
+        print(f"   Node types: {dict(node_types)}")
         
         # Analyze relationships
-        rel_types = {}
-        for source, target, data in graph.edges(data=True):
-            rel_type = data.get('relationship_type', 'unknown')
-            rel_types[rel_type] = rel_types.get(rel_type, 0) + 1
+        rel_types = Counter(data.get('relationship_type', 'unknown') for _, _, data in graph.edges(data=True))
         
-        print(f"   Relationship types: {rel_types}")
+        print(f"   Relationship types: {dict(rel_types)}")
         
         # Find most connected nodes
-        degrees = dict(graph.degree())
-        if degrees:
-            most_connected = max(degrees, key=degrees.get)
-            most_connected_node = graph.nodes[most_connected]
-            print(f"   Most connected node: {most_connected_node.get('name', most_connected[:8])} ({degrees[most_connected]} connections)")
+        most_connected, degree = max(graph.degree(), key=itemgetter(1))
+        most_connected_node = graph.nodes[most_connected]
+        print(f"   Most connected node: {most_connected_node.get('name', most_connected[:8])} ({degree} connections)")
 
+@buffered_stdout()
 def test_knowledge_retrieval():
     """Test retrieving knowledge for dataset generation"""
+    from bigacademy.core.graph_db import GraphDB
+    
     print("\n📚 Testing Knowledge Retrieval")
     print("=" * 50)
     
     db = GraphDB(Path("test_data/extraction_knowledge.db"))
     
     # Load agent profile
-    manager = AgentProfileManager(Path("/Users/franckbirba/DEV/TEST-CREWAI/bigacademy/configs/agents"))
+    manager = _get_agent_manager()
     architect_profile = manager.get_profile("solution_architect")
     
     if not architect_profile:
@@ -250,37 +270,177 @@ def test_knowledge_retrieval():
     
     agent_id = agents[0].id
     
-    # Get all knowledge chunks for agent
-    agent_relationships = db.get_relationships(agent_id, "LEARNS_FROM")
+    # Get all knowledge chunks for agent (edges and nodes in one query)
+    related_nodes = db.get_related_nodes(agent_id, "LEARNS_FROM")
     
-    print(f"📊 Found {len(agent_relationships)} knowledge relationships")
+    print(f"📊 Found {len(related_nodes)} knowledge relationships")
     
     knowledge_chunks = []
-    for rel in agent_relationships:
-        chunk_node = db.get_node(rel.target_id)
-        if chunk_node and chunk_node.node_type == "KnowledgeChunk":
+    for chunk_node in related_nodes:
+        if chunk_node.node_type == "KnowledgeChunk":
+            properties = chunk_node.properties
             knowledge_chunks.append({
-                'content': chunk_node.properties.get('content', ''),
-                'source_path': chunk_node.properties.get('source_path', ''),
-                'relevance_score': chunk_node.properties.get('relevance_score', 0),
-                'file_type': chunk_node.properties.get('file_type', ''),
-                'language': chunk_node.properties.get('language', '')
+                'content': properties.get('content', ''),
+                'source_path': properties.get('source_path', ''),
+                'relevance_score': properties.get('relevance_score', 0),
+                'file_type': properties.get('file_type', ''),
+                'language': properties.get('language', '')
             })
     
-    # Sort by relevance
-    knowledge_chunks.sort(key=lambda x: x['relevance_score'], reverse=True)
-    
     print(f"✅ Retrieved {len(knowledge_chunks)} knowledge chunks")
     
     if knowledge_chunks:
+        # Only the three most relevant are shown - no need to sort them all
         print("📝 Top knowledge chunks:")
-        for i, chunk in enumerate(knowledge_chunks[:3]):
+        top_chunks = heapq.nlargest(3, knowledge_chunks, key=itemgetter('relevance_score'))
+        for i, chunk in enumerate(top_chunks):
             print(f"   {i+1}. {chunk['source_path']} (relevance: {chunk['relevance_score']:.2f})")
             print(f"      Content preview: {chunk['content'][:100]}...")
             print()
     
     return knowledge_chunks
 
+# Schema written by GraphDB before the knowledge_chunks/chunk_blobs tables and name_key existed
+_LEGACY_SCHEMA = """
+    CREATE TABLE nodes (
+        id TEXT PRIMARY KEY,
+        node_type TEXT NOT NULL,
+        properties TEXT NOT NULL,
+        created_at TEXT NOT NULL,
+        updated_at TEXT NOT NULL
+    );
+    CREATE TABLE edges (
+        id TEXT PRIMARY KEY,
+        source_id TEXT NOT NULL,
+        target_id TEXT NOT NULL,
+        relationship_type TEXT NOT NULL,
+        properties TEXT NOT NULL,
+        weight REAL DEFAULT 1.0,
+        created_at TEXT NOT NULL
+    );
+    CREATE TABLE agent_sessions (
+        id TEXT PRIMARY KEY,
+        agent_name TEXT NOT NULL,
+        source_id TEXT NOT NULL,
+        source_type TEXT NOT NULL,
+        total_chunks INTEGER,
+        total_tokens INTEGER,
+        extraction_metadata TEXT,
+        created_at TEXT NOT NULL
+    );
+"""
+
+@buffered_stdout()
+def test_chunk_content_lookup():
+    """Test finding chunks by content stored in the chunk_blobs table"""
+    from bigacademy.core.graph_db import GraphDB
+    from bigacademy.extractors.base_extractor import ExtractionResult, KnowledgeChunk
+    
+    print("\n🔎 Testing Chunk Lookup by Content")
+    print("=" * 50)
+    
+    architect_profile = _get_agent_manager().get_profile("solution_architect")
+    if not architect_profile:
+        print("❌ Could not load architect profile")
+        return False
+    
+    chunks = [
+        KnowledgeChunk(content=f"def handler_{i}(): return {i}", source_path=f"app_{i}.py",
+                       file_type=".py", language="python", size_tokens=6,
+                       relevance_score=0.5, metadata={})
+        for i in range(3)
+    ]
+    result = ExtractionResult(source_id="local://content-lookup", source_type="test",
+                              total_chunks=len(chunks), total_tokens=18, chunks=chunks,
+                              extraction_metadata={})
+    
+    db_path = Path("test_data/content_lookup.db")
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    db_path.unlink(missing_ok=True)
+    
+    db = GraphDB(db_path, test_mode=True)
+    try:
+        db.store_extraction_result(result, architect_profile)
+        found = db.find_nodes("KnowledgeChunk", {"content": chunks[1].content})
+        missing = db.find_nodes("KnowledgeChunk", {"content": "not stored anywhere"})
+        
+        checks = {
+            "find_nodes by blob content": [node.properties["source_path"] for node in found] == ["app_1.py"],
+            "content joined into properties": [node.properties["content"] for node in found] == [chunks[1].content],
+            "no match for unknown content": missing == [],
+        }
+    finally:
+        db.close()
+    
+    for name, passed in checks.items():
+        print(f"   {'✅' if passed else '❌'} {name}")
+    
+    return all(checks.values())
+
+@buffered_stdout()
+def test_legacy_read_only():
+    """Test read-only queries on a database that predates the current schema"""
+    from bigacademy.core.graph_db import GraphDB
+    
+    print("\n🗄️  Testing Read-Only Access to a Legacy Database")
+    print("=" * 50)
+    
+    db_path = Path("test_data/legacy_schema.db")
+    db_path.parent.mkdir(parents=True, exist_ok=True)
+    db_path.unlink(missing_ok=True)
+    
+    now = "2024-01-01T00:00:00"
+    agent_id, chunk_id = str(uuid.uuid4()), str(uuid.uuid4())
+    chunk_properties = {
+        "content": "FastAPI is a modern web framework",
+        "source_path": "main.py",
+        "file_type": ".py",
+        "size_tokens": 7,
+        "relevance_score": 0.8
+    }
+    
+    conn = sqlite3.connect(db_path)
+    conn.executescript(_LEGACY_SCHEMA)
+    conn.executemany("INSERT INTO nodes VALUES (?, ?, ?, ?, ?)", [
+        (agent_id, "Agent", json.dumps({"name": "legacy_agent"}), now, now),
+        (chunk_id, "KnowledgeChunk", json.dumps(chunk_properties), now, now),
+    ])
+    conn.execute("INSERT INTO edges VALUES (?, ?, ?, 'LEARNS_FROM', '{}', 0.8, ?)",
+                 (str(uuid.uuid4()), agent_id, chunk_id, now))
+    conn.commit()
+    conn.close()
+    
+    db = GraphDB(db_path, read_only=True)
+    try:
+        agents = db.find_nodes("Agent", {"name": "legacy_agent"})
+        chunks = db.get_agent_chunk_nodes(agent_id)
+        summaries = db.get_chunk_summaries([chunk_id])
+        graph = db.get_agent_knowledge_graph("legacy_agent")
+        
+        checks = {
+            "find_nodes by name": [agent.id for agent in agents] == [agent_id],
+            "find_nodes by inline content": [
+                chunk.id for chunk in db.find_nodes("KnowledgeChunk", {"content": chunk_properties["content"]})
+            ] == [chunk_id],
+            "chunk properties from JSON": [chunk.properties for chunk in chunks] == [chunk_properties],
+            "chunk summaries": summaries == {chunk_id: ("main.py", 0.8, 7)},
+            "agent knowledge graph": (graph.number_of_nodes(), graph.number_of_edges()) == (2, 1),
+        }
+    finally:
+        db.close()
+    
+    for name, passed in checks.items():
+        print(f"   {'✅' if passed else '❌'} {name}")
+    
+    try:
+        GraphDB(Path("test_data/missing_legacy.db"), read_only=True)
+        print("   ❌ missing database was opened")
+        return False
+    except FileNotFoundError as e:
+        print(f"   ✅ missing database: {e}")
+    
+    return all(checks.values())
+
 def main():
     """Run all graph database tests"""
     print("🧠 BigAcademy Knowledge Graph Database Test Suite")
@@ -303,6 +463,12 @@ def main():
         # Test 4: Knowledge retrieval
         knowledge_chunks = test_knowledge_retrieval()
         
+        # Test 5: Chunk lookup by content
+        test_chunk_content_lookup()
+        
+        # Test 6: Read-only access to a legacy-schema database
+        test_legacy_read_only()
+        
         print("\n🎉 Graph database test suite completed!")
         print("\n💡 Next steps:")
         print("   1. Knowledge graph storage is working")
@@ -6,19 +6,39 @@ Test BigAcademy Generic Prompt Template System
 import sys
 sys.path.append('/Users/franckbirba/DEV/TEST-CREWAI/bigacademy')
 
-from bigacademy.core.agent_profiles import AgentProfileManager
-from bigacademy.core.graph_db import GraphDB
-from bigacademy.generators.prompt_templates import PromptTemplateManager
-from bigacademy.extractors.base_extractor import KnowledgeChunk
+from bigacademy.utils import buffered_stdout
 from pathlib import Path
+from typing import TYPE_CHECKING
+import functools
 
+if TYPE_CHECKING:  # imported lazily at runtime, by the helpers below
+    from bigacademy.core.agent_profiles import AgentProfileManager
+    from bigacademy.generators.prompt_templates import PromptTemplateManager
+
+_AGENTS_DIR = Path(__file__).resolve().parent / "configs" / "agents"
+_TEMPLATES_DIR = Path(__file__).resolve().parent / "configs" / "templates"
+
+@functools.lru_cache(maxsize=1)
+def _get_agent_manager() -> "AgentProfileManager":
+    """Load agent profiles once per test run"""
+    from bigacademy.core.agent_profiles import AgentProfileManager
+    
+    return AgentProfileManager(_AGENTS_DIR)
+
+@functools.lru_cache(maxsize=1)
+def _get_template_manager() -> "PromptTemplateManager":
+    """Load prompt templates once per test run"""
+    from bigacademy.generators.prompt_templates import PromptTemplateManager
+    
+    return PromptTemplateManager(_TEMPLATES_DIR)
+
+@buffered_stdout()
 def test_template_loading():
     """Test loading template configurations"""
     print("🎯 Testing Template Loading")
     print("=" * 50)
     
-    templates_dir = Path("/Users/franckbirba/DEV/TEST-CREWAI/bigacademy/configs/templates")
-    template_manager = PromptTemplateManager(templates_dir)
+    template_manager = _get_template_manager()
     
     available_templates = template_manager.get_available_templates()
     print(f"📋 Available templates: {available_templates}")
@@ -33,14 +53,15 @@ def test_template_loading():
     
     return template_manager
 
+@buffered_stdout()
 def test_agent_template_matching():
     """Test matching templates to agent profiles"""
     print("\n🤖 Testing Agent Template Matching")
     print("=" * 50)
     
     # Load agents
-    agent_manager = AgentProfileManager(Path("/Users/franckbirba/DEV/TEST-CREWAI/bigacademy/configs/agents"))
-    template_manager = PromptTemplateManager(Path("/Users/franckbirba/DEV/TEST-CREWAI/bigacademy/configs/templates"))
+    agent_manager = _get_agent_manager()
+    template_manager = _get_template_manager()
     
     agents = ["solution_architect", "python_developer"]
     
@@ -63,14 +84,17 @@ def test_agent_template_matching():
     
     return agent_manager, template_manager
 
+@buffered_stdout()
 def test_prompt_generation():
     """Test generating actual prompts from templates"""
+    from bigacademy.extractors.base_extractor import KnowledgeChunk
+    
     print("\n🎨 Testing Prompt Generation")
     print("=" * 50)
     
     # Load components
-    agent_manager = AgentProfileManager(Path("/Users/franckbirba/DEV/TEST-CREWAI/bigacademy/configs/agents"))
-    template_manager = PromptTemplateManager(Path("/Users/franckbirba/DEV/TEST-CREWAI/bigacademy/configs/templates"))
+    agent_manager = _get_agent_manager()
+    template_manager = _get_template_manager()
     
     # Get architect profile
     architect = agent_manager.get_profile("solution_architect")
@@ -126,14 +150,18 @@ def protected_route(token: str = Depends(security)):
         except Exception as e:
             print(f"❌ Error generating prompt: {e}")
 
+@buffered_stdout()
 def test_with_real_knowledge():
     """Test prompt generation with real extracted knowledge"""
+    from bigacademy.core.graph_db import GraphDB
+    from bigacademy.extractors.base_extractor import KnowledgeChunk
+    
     print("\n🧠 Testing with Real Knowledge from Graph DB")
     print("=" * 50)
     
     # Load components
-    agent_manager = AgentProfileManager(Path("/Users/franckbirba/DEV/TEST-CREWAI/bigacademy/configs/agents"))
-    template_manager = PromptTemplateManager(Path("/Users/franckbirba/DEV/TEST-CREWAI/bigacademy/configs/templates"))
+    agent_manager = _get_agent_manager()
+    template_manager = _get_template_manager()
     
     # Load from real graph database
     db_path = Path("test_data/fastapi_minimal_architect.db")
@@ -155,25 +183,22 @@ def test_with_real_knowledge():
         return
     
     agent_id = agents[0].id
-    learn_relationships = db.get_relationships(agent_id, "LEARNS_FROM", "outgoing")
+    chunk_nodes = db.get_related_nodes(agent_id, "LEARNS_FROM")
     
-    print(f"📚 Found {len(learn_relationships)} knowledge chunks")
+    print(f"📚 Found {len(chunk_nodes)} knowledge chunks")
     
     # Test with top 3 chunks
-    for i, rel in enumerate(learn_relationships[:3]):
-        chunk_node = db.get_node(rel.target_id)
-        if not chunk_node:
-            continue
-        
+    for i, chunk_node in enumerate(chunk_nodes[:3]):
         # Create knowledge chunk object
+        properties = chunk_node.properties
         real_chunk = KnowledgeChunk(
-            content=chunk_node.properties.get('content', ''),
-            source_path=chunk_node.properties.get('source_path', ''),
-            file_type=chunk_node.properties.get('file_type', ''),
-            language=chunk_node.properties.get('language', 'text'),
-            size_tokens=chunk_node.properties.get('size_tokens', 0),
-            relevance_score=chunk_node.properties.get('relevance_score', 0),
-            metadata=chunk_node.properties.get('metadata', {})
+            content=properties.get('content', ''),
+            source_path=properties.get('source_path', ''),
+            file_type=properties.get('file_type', ''),
+            language=properties.get('language', 'text'),
+            size_tokens=properties.get('size_tokens', 0),
+            relevance_score=properties.get('relevance_score', 0),
+            metadata=properties.get('metadata', {})
         )
         
         source_info = {
@@ -7,19 +7,45 @@ Test knowledge extraction with smaller production repositories
 import sys
 sys.path.append('/Users/franckbirba/DEV/TEST-CREWAI/bigacademy')
 
-from bigacademy.core.agent_profiles import AgentProfileManager
-from bigacademy.core.graph_db import GraphDB
-from bigacademy.extractors.github_extractor import GitHubExtractor
+from bigacademy.utils import run_concurrently, stream_into_db
 from pathlib import Path
 import json
+import re
+
+_AGENTS_DIR = Path(__file__).resolve().parent / "configs" / "agents"
+
+def _technology_finder(technologies):
+    """Build a single-pass, case-insensitive scanner for technology mentions"""
+    by_lower = {}
+    for tech in technologies:
+        by_lower.setdefault(tech.lower(), []).append(tech)
+    if not by_lower:
+        return lambda text: set()
+    
+    # Longest names first: each position reports the longest technology starting there,
+    # and every shorter technology starting at the same position is a prefix of it
+    names = sorted(by_lower, key=len, reverse=True)
+    pattern = re.compile('(?=(' + '|'.join(map(re.escape, names)) + '))', re.IGNORECASE)
+    prefixed = {
+        name: [tech for other in names if name.startswith(other) for tech in by_lower[other]]
+        for name in names
+    }
+    
+    def find(text):
+        return {tech for match in pattern.finditer(text) for tech in prefixed[match.group(1).lower()]}
+    return find
 
 def test_smaller_repo_for_architect():
     """Test smaller repository extraction for Solution Architect"""
+    from bigacademy.core.agent_profiles import AgentProfileManager
+    from bigacademy.core.graph_db import GraphDB
+    from bigacademy.extractors.github_extractor import GitHubExtractor
+    
     print("🏗️  Testing Smaller Repository for Solution Architect")
     print("=" * 60)
     
     # Load Solution Architect profile
-    manager = AgentProfileManager(Path("/Users/franckbirba/DEV/TEST-CREWAI/bigacademy/configs/agents"))
+    manager = AgentProfileManager(_AGENTS_DIR)
     architect_profile = manager.get_profile("solution_architect")
     
     if not architect_profile:
@@ -41,23 +67,15 @@ def test_smaller_repo_for_architect():
     print("   This should take 1-2 minutes...")
     
     try:
-        result = extractor.extract(test_repo, architect_profile)
-        
-        print(f"\n✅ Extraction completed!")
-        print(f"   Total chunks: {result.total_chunks}")
-        print(f"   Total tokens: {result.total_tokens:,}")
-        
-        if result.total_chunks == 0:
-            print("⚠️  No relevant chunks found for this agent")
+        # Chunks go to the graph database as they are parsed
+        result = stream_into_db(extractor, db, test_repo, architect_profile)
+        if result is None:
+            db.close()
             return None
         
-        # Store in graph database
-        session_id = db.store_extraction_result(result, architect_profile)
-        print(f"   Session ID: {session_id[:8]}")
-        
         # Show top relevant files
         print(f"\n📊 Top 10 Most Relevant Files:")
-        for i, chunk in enumerate(result.chunks[:10]):
+        for i, chunk in enumerate(result.chunks):
             print(f"   {i+1:2d}. {chunk.source_path:<50} (relevance: {chunk.relevance_score:.3f}, tokens: {chunk.size_tokens:,})")
         
         # Show knowledge statistics
@@ -75,13 +93,12 @@ def test_smaller_repo_for_architect():
             print(f"   {content_preview}")
         
         # Analyze technologies found
-        found_technologies = []
+        find_technologies = _technology_finder(architect_profile.technologies)
+        found_technologies = set()
         for chunk in result.chunks[:5]:  # Check top 5 chunks
-            for tech in architect_profile.technologies:
-                if tech.lower() in chunk.content.lower():
-                    found_technologies.append(tech)
+            found_technologies |= find_technologies(chunk.content)
         
-        print(f"\n🔧 Technologies found in content: {list(set(found_technologies))}")
+        print(f"\n🔧 Technologies found in content: {list(found_technologies)}")
         
         db.close()
         return result
@@ -93,11 +110,15 @@ def test_smaller_repo_for_architect():
 
 def test_python_project_for_developer():
     """Test Python project for Developer"""
+    from bigacademy.core.agent_profiles import AgentProfileManager
+    from bigacademy.core.graph_db import GraphDB
+    from bigacademy.extractors.github_extractor import GitHubExtractor
+    
     print("\n👨‍💻 Testing Python Project for Developer")
     print("=" * 60)
     
     # Load Python Developer profile
-    manager = AgentProfileManager(Path("/Users/franckbirba/DEV/TEST-CREWAI/bigacademy/configs/agents"))
+    manager = AgentProfileManager(_AGENTS_DIR)
     developer_profile = manager.get_profile("python_developer")
     
     if not developer_profile:
@@ -119,23 +140,15 @@ def test_python_project_for_developer():
     print("   This should take 1-2 minutes...")
     
     try:
-        result = extractor.extract(test_repo, developer_profile)
-        
-        print(f"\n✅ Extraction completed!")
-        print(f"   Total chunks: {result.total_chunks}")
-        print(f"   Total tokens: {result.total_tokens:,}")
-        
-        if result.total_chunks == 0:
-            print("⚠️  No relevant chunks found for this agent")
+        # Chunks go to the graph database as they are parsed
+        result = stream_into_db(extractor, db, test_repo, developer_profile)
+        if result is None:
+            db.close()
             return None
         
-        # Store in graph database
-        session_id = db.store_extraction_result(result, developer_profile)
-        print(f"   Session ID: {session_id[:8]}")
-        
         # Show top relevant files
         print(f"\n📊 Top 10 Most Relevant Files:")
-        for i, chunk in enumerate(result.chunks[:10]):
+        for i, chunk in enumerate(result.chunks):
             print(f"   {i+1:2d}. {chunk.source_path:<50} (relevance: {chunk.relevance_score:.3f}, tokens: {chunk.size_tokens:,})")
         
         # Show knowledge statistics
@@ -153,12 +166,7 @@ def test_python_project_for_developer():
             print(f"   {content_preview}")
         
         # Analyze file types found
-        file_types = {}
-        for chunk in result.chunks:
-            file_type = chunk.file_type or "no_extension"
-            file_types[file_type] = file_types.get(file_type, 0) + 1
-        
-        print(f"\n📁 File types extracted: {dict(sorted(file_types.items(), key=lambda x: x[1], reverse=True))}")
+        print(f"\n📁 File types extracted: {dict(result.file_types.most_common())}")
         
         db.close()
         return result
@@ -176,23 +184,23 @@ def main():
     
     try:
         # Test 1: FastAPI-users for Solution Architect
-        architect_result = test_smaller_repo_for_architect()
-        
-        # Test 2: Pydantic-core for Python Developer  
-        developer_result = test_python_project_for_developer()
+        # Test 2: Pydantic-core for Python Developer
+        # Independent repos and databases, mostly clone/disk I/O - run both at once
+        # and print each test's output in order once it finishes
+        architect_result, developer_result = run_concurrently(
+            [test_smaller_repo_for_architect, test_python_project_for_developer]
+        )
         
         print("\n🎉 Quick test completed!")
         print("\n💡 Key Findings:")
         
         if architect_result:
             print(f"   ✅ Architect extracted {architect_result.total_chunks} chunks from FastAPI-users")
-            avg_relevance = sum(c.relevance_score for c in architect_result.chunks) / len(architect_result.chunks)
-            print(f"      Average relevance: {avg_relevance:.3f}")
+            print(f"      Average relevance: {architect_result.average_relevance:.3f}")
         
         if developer_result:
             print(f"   ✅ Developer extracted {developer_result.total_chunks} chunks from Pydantic-core")
-            avg_relevance = sum(c.relevance_score for c in developer_result.chunks) / len(developer_result.chunks)
-            print(f"      Average relevance: {avg_relevance:.3f}")
+            print(f"      Average relevance: {developer_result.average_relevance:.3f}")
         
         print("\n🚀 BigAcademy is successfully extracting agent-specific knowledge!")
         print("   Ready to scale to larger repositories and build datasets.")
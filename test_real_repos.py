@@ -10,17 +10,34 @@ sys.path.append('/Users/franckbirba/DEV/TEST-CREWAI/bigacademy')
 from bigacademy.core.agent_profiles import AgentProfileManager
 from bigacademy.core.graph_db import GraphDB
 from bigacademy.extractors.github_extractor import GitHubExtractor
+from bigacademy.utils import run_concurrently, stream_into_db
+from operator import attrgetter
 from pathlib import Path
+import functools
 import json
 
+_AGENTS_DIR = Path(__file__).resolve().parent / "configs" / "agents"
+
+# (source_path, relevance_score, size_tokens) for the top-file listings
+_chunk_summary = attrgetter("source_path", "relevance_score", "size_tokens")
+
+@functools.lru_cache(maxsize=1)
+def _get_agent_manager() -> AgentProfileManager:
+    """Create the agent profile manager once per test run"""
+    return AgentProfileManager(_AGENTS_DIR)
+
+@functools.lru_cache(maxsize=32)
+def _get_profile(name: str):
+    """Load an agent profile once per test run"""
+    return _get_agent_manager().get_profile(name)
+
 def test_crewai_for_architect():
     """Test CrewAI repository extraction for Solution Architect"""
     print("🏗️  Testing CrewAI Repository for Solution Architect")
     print("=" * 60)
     
     # Load Solution Architect profile
-    manager = AgentProfileManager(Path("/Users/franckbirba/DEV/TEST-CREWAI/bigacademy/configs/agents"))
-    architect_profile = manager.get_profile("solution_architect")
+    architect_profile = _get_profile("solution_architect")
     
     if not architect_profile:
         print("❌ Could not load Solution Architect profile")
@@ -31,7 +48,13 @@ def test_crewai_for_architect():
     print(f"   Focus Areas: {', '.join(architect_profile.focus_areas[:5])}")
     
     # Initialize extractor and database
-    extractor = GitHubExtractor(config={'clone_depth': 1, 'timeout': 300})
+    # Re-runs within the hour reuse the cached partial clone without touching the network
+    extractor = GitHubExtractor(config={
+        'clone_depth': 1,
+        'timeout': 300,
+        'cache_dir': 'test_data/_repo_cache',
+        'cache_max_age': 3600
+    })
     db = GraphDB(Path("test_data/crewai_architect_knowledge.db"))
     
     # Extract from CrewAI repository
@@ -41,24 +64,16 @@ def test_crewai_for_architect():
     print("   This may take a few minutes...")
     
     try:
-        result = extractor.extract(crewai_repo, architect_profile)
-        
-        print(f"\n✅ Extraction completed!")
-        print(f"   Total chunks: {result.total_chunks}")
-        print(f"   Total tokens: {result.total_tokens:,}")
-        
-        if result.total_chunks == 0:
-            print("⚠️  No relevant chunks found for this agent")
+        # Stream chunks into the graph database; only the top 10 stay in memory
+        result = stream_into_db(extractor, db, crewai_repo, architect_profile)
+        if result is None:
+            db.close()
             return None
         
-        # Store in graph database
-        session_id = db.store_extraction_result(result, architect_profile)
-        print(f"   Session ID: {session_id[:8]}")
-        
         # Show top relevant files
         print(f"\n📊 Top 10 Most Relevant Files:")
-        for i, chunk in enumerate(result.chunks[:10]):
-            print(f"   {i+1:2d}. {chunk.source_path:<40} (relevance: {chunk.relevance_score:.3f}, tokens: {chunk.size_tokens:,})")
+        for i, (path, relevance, tokens) in enumerate(map(_chunk_summary, result.chunks)):
+            print(f"   {i+1:2d}. {path:<40} (relevance: {relevance:.3f}, tokens: {tokens:,})")
         
         # Show knowledge statistics
         stats = db.get_knowledge_statistics(architect_profile.name)
@@ -88,8 +103,7 @@ def test_fastapi_for_developer():
     print("=" * 60)
     
     # Load Python Developer profile
-    manager = AgentProfileManager(Path("/Users/franckbirba/DEV/TEST-CREWAI/bigacademy/configs/agents"))
-    developer_profile = manager.get_profile("python_developer")
+    developer_profile = _get_profile("python_developer")
     
     if not developer_profile:
         print("❌ Could not load Python Developer profile")
@@ -100,7 +114,13 @@ def test_fastapi_for_developer():
     print(f"   Focus Areas: {', '.join(developer_profile.focus_areas[:5])}")
     
     # Initialize extractor and database
-    extractor = GitHubExtractor(config={'clone_depth': 1, 'timeout': 300})
+    # Re-runs within the hour reuse the cached partial clone without touching the network
+    extractor = GitHubExtractor(config={
+        'clone_depth': 1,
+        'timeout': 300,
+        'cache_dir': 'test_data/_repo_cache',
+        'cache_max_age': 3600
+    })
     db = GraphDB(Path("test_data/fastapi_developer_knowledge.db"))
     
     # Extract from FastAPI repository
@@ -110,24 +130,16 @@ def test_fastapi_for_developer():
     print("   This may take a few minutes...")
     
     try:
-        result = extractor.extract(fastapi_repo, developer_profile)
-        
-        print(f"\n✅ Extraction completed!")
-        print(f"   Total chunks: {result.total_chunks}")
-        print(f"   Total tokens: {result.total_tokens:,}")
-        
-        if result.total_chunks == 0:
-            print("⚠️  No relevant chunks found for this agent")
+        # Stream chunks into the graph database; only the top 10 stay in memory
+        result = stream_into_db(extractor, db, fastapi_repo, developer_profile)
+        if result is None:
+            db.close()
             return None
         
-        # Store in graph database
-        session_id = db.store_extraction_result(result, developer_profile)
-        print(f"   Session ID: {session_id[:8]}")
-        
         # Show top relevant files
         print(f"\n📊 Top 10 Most Relevant Files:")
-        for i, chunk in enumerate(result.chunks[:10]):
-            print(f"   {i+1:2d}. {chunk.source_path:<40} (relevance: {chunk.relevance_score:.3f}, tokens: {chunk.size_tokens:,})")
+        for i, (path, relevance, tokens) in enumerate(map(_chunk_summary, result.chunks)):
+            print(f"   {i+1:2d}. {path:<40} (relevance: {relevance:.3f}, tokens: {tokens:,})")
         
         # Show knowledge statistics
         stats = db.get_knowledge_statistics(developer_profile.name)
@@ -151,6 +163,18 @@ def test_fastapi_for_developer():
         db.close()
         return None
 
+def _first_unique_paths(chunks, k: int) -> list:
+    """First k distinct source paths, stopping as soon as they are found"""
+    paths = []
+    seen = set()
+    for chunk in chunks:
+        if chunk.source_path not in seen:
+            seen.add(chunk.source_path)
+            paths.append(chunk.source_path)
+            if len(paths) == k:
+                break
+    return paths
+
 def compare_extraction_results(crewai_result, fastapi_result):
     """Compare extraction results between different agents and repositories"""
     print("\n📊 Comparing Extraction Results")
@@ -165,36 +189,25 @@ def compare_extraction_results(crewai_result, fastapi_result):
     print(f"   FastAPI (Developer): {fastapi_result.total_chunks:,} chunks, {fastapi_result.total_tokens:,} tokens")
     
     # Calculate average relevance scores
-    crewai_avg_relevance = sum(c.relevance_score for c in crewai_result.chunks) / len(crewai_result.chunks) if crewai_result.chunks else 0
-    fastapi_avg_relevance = sum(c.relevance_score for c in fastapi_result.chunks) / len(fastapi_result.chunks) if fastapi_result.chunks else 0
+    crewai_avg_relevance = crewai_result.average_relevance
+    fastapi_avg_relevance = fastapi_result.average_relevance
     
     print(f"\n🎯 Average Relevance Scores:")
     print(f"   CrewAI (Architect):  {crewai_avg_relevance:.3f}")
     print(f"   FastAPI (Developer): {fastapi_avg_relevance:.3f}")
     
     # Analyze file types
-    crewai_file_types = {}
-    fastapi_file_types = {}
-    
-    for chunk in crewai_result.chunks:
-        file_type = chunk.file_type or "no_extension"
-        crewai_file_types[file_type] = crewai_file_types.get(file_type, 0) + 1
-    
-    for chunk in fastapi_result.chunks:
-        file_type = chunk.file_type or "no_extension"
-        fastapi_file_types[file_type] = fastapi_file_types.get(file_type, 0) + 1
+    crewai_file_types = crewai_result.file_types
+    fastapi_file_types = fastapi_result.file_types
     
     print(f"\n📁 File Type Distribution:")
-    print(f"   CrewAI (Architect):  {dict(sorted(crewai_file_types.items(), key=lambda x: x[1], reverse=True)[:5])}")
-    print(f"   FastAPI (Developer): {dict(sorted(fastapi_file_types.items(), key=lambda x: x[1], reverse=True)[:5])}")
+    print(f"   CrewAI (Architect):  {dict(crewai_file_types.most_common(5))}")
+    print(f"   FastAPI (Developer): {dict(fastapi_file_types.most_common(5))}")
     
     # Show different focus areas
-    crewai_paths = {chunk.source_path for chunk in crewai_result.chunks}
-    fastapi_paths = {chunk.source_path for chunk in fastapi_result.chunks}
-    
     print(f"\n🎯 Agent-Specific Focus Examples:")
-    print(f"   Architect focuses on: {list(crewai_paths)[:3]}")
-    print(f"   Developer focuses on: {list(fastapi_paths)[:3]}")
+    print(f"   Architect focuses on: {_first_unique_paths(crewai_result.chunks, 3)}")
+    print(f"   Developer focuses on: {_first_unique_paths(fastapi_result.chunks, 3)}")
 
 def main():
     """Run real repository tests"""
@@ -205,10 +218,12 @@ def main():
     
     try:
         # Test 1: CrewAI for Solution Architect
-        crewai_result = test_crewai_for_architect()
-        
         # Test 2: FastAPI for Python Developer
-        fastapi_result = test_fastapi_for_developer()
+        # Independent repos and databases, mostly clone/disk I/O - run both at once
+        # and print each test's output in order once it finishes
+        crewai_result, fastapi_result = run_concurrently(
+            [test_crewai_for_architect, test_fastapi_for_developer]
+        )
         
         # Test 3: Compare results
         compare_extraction_results(crewai_result, fastapi_result)
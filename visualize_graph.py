@@ -7,11 +7,72 @@ Text-based visualization of the knowledge graph database
 import sys
 sys.path.append('/Users/franckbirba/DEV/TEST-CREWAI/bigacademy')
 
-from bigacademy.core.graph_db import GraphDB
+from bigacademy.core.graph_db import GraphDB, GraphEdge
+from bigacademy.utils import buffered_stdout
+from operator import attrgetter, itemgetter
 from pathlib import Path
+from typing import Any, Dict, List, Optional
+import heapq
 import json
 
-def visualize_graph_structure(db: GraphDB, agent_name: str = None):
+# Static box diagram drawn by create_ascii_graph
+_ASCII_TEMPLATE = """\
+                    BIGACADEMY KNOWLEDGE GRAPH
+
+    ┌─────────────────────────────────────────────────────────────────┐
+    │                          SOURCES                                │
+    └─────────────────────┬───────────────────────────────────────────┘
+                          │ EXTRACTS_FROM
+                          ▼
+        ┌─────────────────────────────────────────────────────┐
+        │                   AGENT                             │
+        │              {agent:<20}              │
+        │         ({title:<25})         │
+        └─────────────────┬───────────────────┬───────────────┘
+                          │                   │
+                 REQUIRES │                   │ SPECIALIZES_IN
+                          ▼                   ▼
+        ┌─────────────────┐                   ┌─────────────────┐
+        │  TECHNOLOGIES   │                   │     SKILLS      │
+        │   ({n_tech} items)       │                   │   ({n_skill} items)       │
+        └─────────────────┘                   └─────────────────┘
+                  │                                   │
+         IMPLEMENTS │                                   │ DEMONSTRATES
+                  ▼                                   ▼
+        ┌─────────────────────────────────────────────────────┐
+        │                KNOWLEDGE CHUNKS                    │
+        │                  ({n_learn} chunks)                      │
+        │            (Extracted & Filtered Content)          │
+        └─────────────────────────────────────────────────────┘
+
+"""
+
+def _rank_learned_chunks(rels: Dict[str, List[GraphEdge]]) -> Dict[str, List[GraphEdge]]:
+    """Order LEARNS_FROM edges by relevance (their weight), whatever order they were stored in"""
+    if "LEARNS_FROM" in rels:
+        rels["LEARNS_FROM"] = sorted(rels["LEARNS_FROM"], key=attrgetter('weight'), reverse=True)
+    return rels
+
+def collect_agent_view(db: GraphDB, agent_name: str) -> Optional[Dict[str, Any]]:
+    """Fetch an agent, its outgoing relationships and their targets once for all views"""
+    agents = db.find_nodes("Agent", {"name": agent_name})
+    if not agents:
+        return None
+    
+    agent = agents[0]
+    rels = _rank_learned_chunks(db.get_all_outgoing(agent.id))
+    
+    # Every target except the learned chunks, of which only the 3 most relevant are shown
+    target_ids = [
+        rel.target_id
+        for rel_type, type_rels in rels.items()
+        for rel in (type_rels[:3] if rel_type == "LEARNS_FROM" else type_rels)
+    ]
+    return {"agent": agent, "rels": rels, "nodes": db.get_nodes(target_ids)}
+
+@buffered_stdout()
+def visualize_graph_structure(db: GraphDB, agent_name: str = None,
+                              view: Optional[Dict[str, Any]] = None):
     """Create text-based visualization of graph structure"""
     print("🕸️  BigAcademy Knowledge Graph Structure")
     print("=" * 60)
@@ -28,12 +89,11 @@ def visualize_graph_structure(db: GraphDB, agent_name: str = None):
     
     print()
     
-    # Get all nodes by type
-    agents = db.find_nodes("Agent")
-    sources = db.find_nodes("Source")
-    chunks = db.find_nodes("KnowledgeChunk")
-    technologies = db.find_nodes("Technology")
-    skills = db.find_nodes("Skill")
+    # Get the requested agent, or all agents
+    if view:
+        agents = [view["agent"]]
+    else:
+        agents = db.find_nodes("Agent", {"name": agent_name} if agent_name else None)
     
     print("🎯 Graph Structure Visualization:")
     print()
@@ -46,30 +106,28 @@ def visualize_graph_structure(db: GraphDB, agent_name: str = None):
         print(f"🤖 AGENT: {agent_name}")
         print(f"   └── Role: {agent_title}")
         
-        # Get agent relationships
-        relationships = db.get_relationships(agent.id, direction="outgoing")
-        
-        # Group relationships by type
-        rel_groups = {}
-        for rel in relationships:
-            rel_type = rel.relationship_type
-            if rel_type not in rel_groups:
-                rel_groups[rel_type] = []
-            rel_groups[rel_type].append(rel)
+        # Get agent relationships, grouped by type, and the targets shown below
+        if view:
+            rel_groups, target_nodes = view["rels"], view["nodes"]
+        else:
+            rel_groups = _rank_learned_chunks(db.get_all_outgoing(agent.id))
+            target_nodes = db.get_nodes([rel.target_id for rels in rel_groups.values() for rel in rels[:3]])
         
         # Show each relationship type
         for rel_type, rels in rel_groups.items():
             print(f"   │")
             print(f"   ├── {rel_type} ({len(rels)})")
             
-            for i, rel in enumerate(rels[:3]):  # Show first 3
-                target_node = db.get_node(rel.target_id)
+            shown_rels = rels[:3]  # Show first 3
+            last_index = len(shown_rels) - 1
+            for i, rel in enumerate(shown_rels):
+                target_node = target_nodes.get(rel.target_id)
                 if target_node:
                     target_name = target_node.properties.get('name', 
                                    target_node.properties.get('url', 
                                    target_node.properties.get('source_path', 'unknown')))
                     
-                    connector = "└──" if i == len(rels[:3]) - 1 else "├──"
+                    connector = "└──" if i == last_index else "├──"
                     print(f"   │   {connector} {target_node.node_type}: {target_name[:50]}...")
             
             if len(rels) > 3:
@@ -77,26 +135,33 @@ def visualize_graph_structure(db: GraphDB, agent_name: str = None):
         
         print()
 
-def visualize_knowledge_flow(db: GraphDB, agent_name: str):
+@buffered_stdout()
+def visualize_knowledge_flow(db: GraphDB, agent_name: str,
+                             view: Optional[Dict[str, Any]] = None):
     """Visualize knowledge flow for specific agent"""
     print(f"🌊 Knowledge Flow for Agent: {agent_name}")
     print("=" * 60)
     
     # Find agent
-    agents = db.find_nodes("Agent", {"name": agent_name})
-    if not agents:
+    view = view or collect_agent_view(db, agent_name)
+    if not view:
         print(f"❌ Agent '{agent_name}' not found")
         return
     
-    agent = agents[0]
+    rels, nodes = view["rels"], view["nodes"]
     
     # Get extraction sessions
-    extract_rels = db.get_relationships(agent.id, "EXTRACTS_FROM", "outgoing")
+    extract_rels = rels.get("EXTRACTS_FROM", [])
     
     print(f"📚 Knowledge Sources ({len(extract_rels)}):")
     
+    # Fetch the sources, their chunk links and every chunk's summary in batches
+    source_ids = [rel.target_id for rel in extract_rels if rel.target_id in nodes]
+    chunk_rels_by_source = db.get_relationships_bulk(source_ids, "CONTAINS", "outgoing")
+    chunk_summaries = db.get_chunk_summaries([rel.target_id for rels in chunk_rels_by_source.values() for rel in rels])
+    
     for i, extract_rel in enumerate(extract_rels):
-        source_node = db.get_node(extract_rel.target_id)
+        source_node = nodes.get(extract_rel.target_id)
         if source_node:
             source_url = source_node.properties.get('url', 'unknown')
             total_chunks = source_node.properties.get('total_chunks', 0)
@@ -106,62 +171,67 @@ def visualize_knowledge_flow(db: GraphDB, agent_name: str):
             print(f"      └── Extracted: {total_chunks} chunks, {total_tokens:,} tokens")
             
             # Get chunks from this source
-            chunk_rels = db.get_relationships(source_node.id, "CONTAINS", "outgoing")
+            chunk_rels = chunk_rels_by_source[source_node.id]
             
             print(f"      └── Top Knowledge Chunks:")
             
-            # Get chunk details and sort by relevance
-            chunk_details = []
-            for chunk_rel in chunk_rels[:10]:  # Top 10
-                chunk_node = db.get_node(chunk_rel.target_id)
-                if chunk_node:
-                    chunk_details.append({
-                        'path': chunk_node.properties.get('source_path', 'unknown'),
-                        'relevance': chunk_node.properties.get('relevance_score', 0),
-                        'tokens': chunk_node.properties.get('size_tokens', 0),
-                        'file_type': chunk_node.properties.get('file_type', 'unknown')
-                    })
+            # Chunk details as (path, relevance, tokens); chunks may be stored in
+            # any order (streamed extraction writes them in file order)
+            chunk_details = [
+                chunk_summaries[chunk_rel.target_id]
+                for chunk_rel in chunk_rels
+                if chunk_rel.target_id in chunk_summaries
+            ]
             
-            # Sort by relevance
-            chunk_details.sort(key=lambda x: x['relevance'], reverse=True)
+            # Five most relevant, no full sort needed
+            top_chunks = heapq.nlargest(5, chunk_details, key=itemgetter(1))
             
-            for j, chunk in enumerate(chunk_details[:5]):
-                print(f"          {j+1}. {chunk['path']:<40} (rel: {chunk['relevance']:.3f}, {chunk['tokens']:,} tokens)")
+            for j, (path, relevance, tokens) in enumerate(top_chunks):
+                print(f"          {j+1}. {path:<40} (rel: {relevance:.3f}, {tokens:,} tokens)")
     
     print()
 
-def visualize_technology_skills_network(db: GraphDB, agent_name: str):
+@buffered_stdout()
+def visualize_technology_skills_network(db: GraphDB, agent_name: str,
+                                        view: Optional[Dict[str, Any]] = None):
     """Visualize technology and skills network"""
     print(f"🔧 Technology & Skills Network for: {agent_name}")
     print("=" * 60)
     
     # Find agent
-    agents = db.find_nodes("Agent", {"name": agent_name})
-    if not agents:
+    view = view or collect_agent_view(db, agent_name)
+    if not view:
         print(f"❌ Agent '{agent_name}' not found")
         return
     
-    agent = agents[0]
+    rels, nodes = view["rels"], view["nodes"]
     
     # Get technologies
-    tech_rels = db.get_relationships(agent.id, "REQUIRES", "outgoing")
-    skill_rels = db.get_relationships(agent.id, "SPECIALIZES_IN", "outgoing")
+    tech_rels = rels.get("REQUIRES", [])
+    skill_rels = rels.get("SPECIALIZES_IN", [])
+    
+    # Fetch the technologies' and skills' chunk links and the sample chunks in batches
+    tech_ids = [rel.target_id for rel in tech_rels if rel.target_id in nodes]
+    skill_ids = [rel.target_id for rel in skill_rels if rel.target_id in nodes]
+    impl_rels_by_tech = db.get_relationships_bulk(tech_ids, "IMPLEMENTS", "incoming")
+    demo_rels_by_skill = db.get_relationships_bulk(skill_ids, "DEMONSTRATES", "incoming")
+    sample_chunks = db.get_nodes([rel.source_id for rels in impl_rels_by_tech.values() for rel in rels[:3]])
     
     print(f"🔧 Technologies ({len(tech_rels)}):")
     for tech_rel in tech_rels:
-        tech_node = db.get_node(tech_rel.target_id)
+        tech_node = nodes.get(tech_rel.target_id)
         if tech_node:
             tech_name = tech_node.properties.get('name', 'unknown')
             
             # Find chunks that implement this technology
-            impl_rels = db.get_relationships(tech_node.id, "IMPLEMENTS", "incoming")
+            impl_rels = impl_rels_by_tech[tech_node.id]
             
             print(f"   └── {tech_name}")
             print(f"       └── Implemented in {len(impl_rels)} knowledge chunks")
             
             # Show sample implementations
             for i, impl_rel in enumerate(impl_rels[:3]):
-                chunk_node = db.get_node(impl_rel.source_id)
+                chunk_node = sample_chunks.get(impl_rel.source_id)
                 if chunk_node:
                     chunk_path = chunk_node.properties.get('source_path', 'unknown')
                     print(f"           {i+1}. {chunk_path}")
@@ -169,13 +239,13 @@ def visualize_technology_skills_network(db: GraphDB, agent_name: str):
     print()
     print(f"🎯 Skills & Expertise ({len(skill_rels)}):")
     for skill_rel in skill_rels:
-        skill_node = db.get_node(skill_rel.target_id)
+        skill_node = nodes.get(skill_rel.target_id)
         if skill_node:
             skill_name = skill_node.properties.get('name', 'unknown')
             keywords = skill_node.properties.get('keywords', [])
             
             # Find chunks that demonstrate this skill
-            demo_rels = db.get_relationships(skill_node.id, "DEMONSTRATES", "incoming")
+            demo_rels = demo_rels_by_skill[skill_node.id]
             
             print(f"   └── {skill_name}")
             print(f"       ├── Keywords: {', '.join(keywords[:5])}")
@@ -186,55 +256,36 @@ def visualize_technology_skills_network(db: GraphDB, agent_name: str):
                 avg_score = sum(rel.weight for rel in demo_rels) / len(demo_rels)
                 print(f"           └── Average relevance: {avg_score:.3f}")
 
-def create_ascii_graph(db: GraphDB, agent_name: str):
+@buffered_stdout()
+def create_ascii_graph(db: GraphDB, agent_name: str,
+                       view: Optional[Dict[str, Any]] = None):
     """Create ASCII art representation of the graph"""
     print(f"🎨 ASCII Graph Representation for: {agent_name}")
     print("=" * 80)
     
     # Find agent
-    agents = db.find_nodes("Agent", {"name": agent_name})
-    if not agents:
+    view = view or collect_agent_view(db, agent_name)
+    if not view:
         print(f"❌ Agent '{agent_name}' not found")
         return
     
-    agent = agents[0]
+    agent, rels, nodes = view["agent"], view["rels"], view["nodes"]
     
     # Get relationships
-    extract_rels = db.get_relationships(agent.id, "EXTRACTS_FROM", "outgoing")
-    tech_rels = db.get_relationships(agent.id, "REQUIRES", "outgoing")
-    skill_rels = db.get_relationships(agent.id, "SPECIALIZES_IN", "outgoing")
-    learn_rels = db.get_relationships(agent.id, "LEARNS_FROM", "outgoing")
+    extract_rels = rels.get("EXTRACTS_FROM", [])
+    tech_rels = rels.get("REQUIRES", [])
+    skill_rels = rels.get("SPECIALIZES_IN", [])
+    learn_rels = rels.get("LEARNS_FROM", [])
     
     agent_name_display = agent.properties.get('name', 'Agent')
     
-    print("                    BIGACADEMY KNOWLEDGE GRAPH")
-    print()
-    print("    ┌─────────────────────────────────────────────────────────────────┐")
-    print("    │                          SOURCES                                │")
-    print("    └─────────────────────┬───────────────────────────────────────────┘")
-    print("                          │ EXTRACTS_FROM")
-    print("                          ▼")
-    print(f"        ┌─────────────────────────────────────────────────────┐")
-    print(f"        │                   AGENT                             │")
-    print(f"        │              {agent_name_display:<20}              │")
-    print(f"        │         ({agent.properties.get('title', 'Unknown Role'):<25})         │")
-    print(f"        └─────────────────┬───────────────────┬───────────────┘")
-    print("                          │                   │")
-    print("                 REQUIRES │                   │ SPECIALIZES_IN")
-    print("                          ▼                   ▼")
-    print("        ┌─────────────────┐                   ┌─────────────────┐")
-    print(f"        │  TECHNOLOGIES   │                   │     SKILLS      │")
-    print(f"        │   ({len(tech_rels)} items)       │                   │   ({len(skill_rels)} items)       │")
-    print("        └─────────────────┘                   └─────────────────┘")
-    print("                  │                                   │")
-    print("         IMPLEMENTS │                                   │ DEMONSTRATES")
-    print("                  ▼                                   ▼")
-    print("        ┌─────────────────────────────────────────────────────┐")
-    print("        │                KNOWLEDGE CHUNKS                    │")
-    print(f"        │                  ({len(learn_rels)} chunks)                      │")
-    print("        │            (Extracted & Filtered Content)          │")
-    print("        └─────────────────────────────────────────────────────┘")
-    print()
+    sys.stdout.write(_ASCII_TEMPLATE.format(
+        agent=agent_name_display,
+        title=agent.properties.get('title', 'Unknown Role'),
+        n_tech=len(tech_rels),
+        n_skill=len(skill_rels),
+        n_learn=len(learn_rels),
+    ))
     
     # Show detailed breakdown
     print("📊 Detailed Breakdown:")
@@ -248,7 +299,7 @@ def create_ascii_graph(db: GraphDB, agent_name: str):
     if tech_rels:
         print(f"\n   🔧 Technologies:")
         for tech_rel in tech_rels:
-            tech_node = db.get_node(tech_rel.target_id)
+            tech_node = nodes.get(tech_rel.target_id)
             if tech_node:
                 tech_name = tech_node.properties.get('name', 'unknown')
                 print(f"      • {tech_name}")
@@ -257,7 +308,7 @@ def create_ascii_graph(db: GraphDB, agent_name: str):
     if skill_rels:
         print(f"\n   🎯 Skills:")
         for skill_rel in skill_rels:
-            skill_node = db.get_node(skill_rel.target_id)
+            skill_node = nodes.get(skill_rel.target_id)
             if skill_node:
                 skill_name = skill_node.properties.get('name', 'unknown')
                 print(f"      • {skill_name}")
@@ -285,19 +336,24 @@ def main():
         print(f"{'='*70}")
         
         try:
-            db = GraphDB(db_file)
-            
-            # 1. Overall structure
-            visualize_graph_structure(db, agent_name)
-            
-            # 2. Knowledge flow
-            visualize_knowledge_flow(db, agent_name)
-            
-            # 3. Technology & skills network  
-            visualize_technology_skills_network(db, agent_name)
+            db = GraphDB(db_file, read_only=True)
             
-            # 4. ASCII representation
-            create_ascii_graph(db, agent_name)
+            # One visualization run: node lookups are cached for its duration
+            with db.cached_reads():
+                # Fetch the agent's relationships and their targets once for all views
+                view = collect_agent_view(db, agent_name)
+                
+                # 1. Overall structure
+                visualize_graph_structure(db, agent_name, view)
+                
+                # 2. Knowledge flow
+                visualize_knowledge_flow(db, agent_name, view)
+                
+                # 3. Technology & skills network  
+                visualize_technology_skills_network(db, agent_name, view)
+                
+                # 4. ASCII representation
+                create_ascii_graph(db, agent_name, view)
             
             db.close()
             